@@ -1,7 +1,38 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import User, Course, Module, Topic, TopicQuestion, TopicQuestionOption, TopicQuestionAnswer, TopicProgress
+from .models import User, Course, Module, Topic, TopicQuestion, TopicQuestionOption, TopicQuestionAnswer, TopicQuestionAnswerArchive, TopicProgress, Job
+from .services import mark_course_changed
+
+
+class ContentVersionAdminMixin:
+    """
+    Questions and options feed the grading cache, which is keyed by the
+    course content version: every admin save or delete bumps it once.
+    `course_path` leads from the model to its course id.
+    """
+    course_path = None
+
+    def course_ids(self, queryset):
+        return set(queryset.values_list(self.course_path, flat=True))
+
+    def save_related(self, request, form, formsets, change):
+        # after the inlines, so one bump covers the object and its options
+        super().save_related(request, form, formsets, change)
+        for course_id in self.course_ids(self.model.objects.filter(pk=form.instance.pk)):
+            mark_course_changed(course_id)
+
+    def delete_model(self, request, obj):
+        course_ids = self.course_ids(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        for course_id in course_ids:
+            mark_course_changed(course_id)
+
+    def delete_queryset(self, request, queryset):
+        course_ids = self.course_ids(queryset)
+        super().delete_queryset(request, queryset)
+        for course_id in course_ids:
+            mark_course_changed(course_id)
 
 
 @admin.register(User)
@@ -51,13 +82,15 @@ class TopicQuestionOptionInline(admin.TabularInline):
     extra = 2
 
 @admin.register(TopicQuestion)
-class TopicQuestionAdmin(admin.ModelAdmin):
+class TopicQuestionAdmin(ContentVersionAdminMixin, admin.ModelAdmin):
+    course_path = "topic__module__course_id"
     list_display = ("id", "topic", "order", "question_type", "max_score")
     list_filter = ("topic", "question_type")
     inlines = [TopicQuestionOptionInline]
 
 @admin.register(TopicQuestionOption)
-class TopicQuestionOptionAdmin(admin.ModelAdmin):
+class TopicQuestionOptionAdmin(ContentVersionAdminMixin, admin.ModelAdmin):
+    course_path = "question__topic__module__course_id"
     list_display = ("id", "question", "text", "is_correct")
     list_filter = ("is_correct",)
 
@@ -66,6 +99,11 @@ class TopicQuestionAnswerAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "question", "is_correct", "score", "answered_at")
     list_filter = ("is_correct", "question__topic")
 
+@admin.register(TopicQuestionAnswerArchive)
+class TopicQuestionAnswerArchiveAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "question", "is_correct", "score", "answered_at", "archived_at")
+    list_filter = ("is_correct",)
+
 @admin.register(TopicProgress)
 class TopicProgressAdmin(admin.ModelAdmin):
     list_display = (
@@ -82,4 +120,8 @@ class TopicProgressAdmin(admin.ModelAdmin):
     )
     list_filter = ("status", "is_timed", "timed_out")
 
-
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "owner", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("started_at", "finished_at", "locked_by")
@@ -0,0 +1,95 @@
+"""
+Cache helpers on top of Django's cache framework (backend chosen in settings).
+
+Keys are namespaced as "<namespace>:s<schema>:<parts>". Bump the schema
+version of a namespace when the shape of its cached payload changes, so old
+workers and new workers never read each other's entries.
+
+Tags are version counters stored in the cache. A tagged key embeds the
+current version of each tag; invalidating a tag increments its counter, so
+every key built with the old version is never read again and simply expires.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# namespace -> payload schema version
+SCHEMA_VERSIONS = {
+    "course-outline": 2,  # 2: topic content replaced by content_length
+    "topic-course": 1,
+    "enrolled-courses": 1,
+    "grading": 1,
+}
+
+TAG_TIMEOUT = None  # tag counters must outlive every key that embeds them
+
+# backends whose entries only the current process sees
+PER_PROCESS_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache() -> bool:
+    """
+    True when every worker reads the same tag counters, i.e. when a tag
+    version alone can serve as an HTTP validator.
+    """
+    return settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_BACKENDS
+
+
+def make_key(namespace: str, *parts) -> str:
+    schema = SCHEMA_VERSIONS.get(namespace, 1)
+    return ":".join([namespace, f"s{schema}", *(str(p) for p in parts)])
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+def _fresh_version() -> int:
+    # Time based, so a counter that was evicted and recreated never reuses
+    # a version that old keys may still carry.
+    return time.time_ns() // 1000
+
+
+def get_tag_versions(*tags) -> list[int]:
+    tag_keys = [_tag_key(tag) for tag in tags]
+    stored = cache.get_many(tag_keys)
+    versions = []
+    for tag_key in tag_keys:
+        version = stored.get(tag_key)
+        if version is None:
+            # add() keeps a concurrently created counter
+            cache.add(tag_key, _fresh_version(), TAG_TIMEOUT)
+            version = cache.get(tag_key) or _fresh_version()
+        versions.append(version)
+    return versions
+
+
+def tagged_key(namespace: str, *parts, tags=()) -> str:
+    key = make_key(namespace, *parts)
+    if not tags:
+        return key
+    versions = get_tag_versions(*tags)
+    return f"{key}:t" + ".".join(str(v) for v in versions)
+
+
+def invalidate_tags(*tags) -> None:
+    for tag in tags:
+        tag_key = _tag_key(tag)
+        try:
+            cache.incr(tag_key)
+        except ValueError:
+            # never read yet, or evicted
+            cache.set(tag_key, _fresh_version(), TAG_TIMEOUT)
+
+
+def course_tag(course_id) -> str:
+    return f"course:{course_id}"
+
+
+def catalog_tag() -> str:
+    # anything shown on the public course list: course rows, author names
+    return "catalog"
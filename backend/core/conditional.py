@@ -0,0 +1,96 @@
+"""
+Conditional GET for API views.
+
+Views compute strong ETags from version counters (course content version,
+user progress timestamp) *before* loading and serializing the body, and
+answer `304 Not Modified` when the client's If-None-Match / If-Modified-Since
+still matches.
+"""
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from .cache import catalog_tag, course_tag, get_tag_versions, is_shared_cache
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(
+        ":".join(str(part) for part in parts).encode(),
+        digest_size=16,
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def user_version(user) -> str:
+    """
+    Per-user part of a validator: progress and enrollments of the user.
+    """
+    if not user or user.is_anonymous:
+        return "anon"
+    changed_at = user.progress_updated_at
+    return f"{user.pk}.{changed_at.timestamp() if changed_at else 0}"
+
+
+def course_version(course_id, content_version, content_updated_at) -> str:
+    # the tag catches admin edits of modules / topics (see core.signals)
+    tag_version, = get_tag_versions(course_tag(course_id))
+    updated = content_updated_at.timestamp() if content_updated_at else 0
+    return f"{course_id}.{content_version}.{updated}.{tag_version}"
+
+
+def author_version(author) -> str:
+    # author_name is rendered from these; a rename must change the ETag
+    if author is None:
+        return "none"
+    return f"{author.pk}.{author.username}.{author.first_name}.{author.last_name}"
+
+
+def catalog_version() -> str | None:
+    """
+    Validator of the public course list: the catalog tag (course saves and
+    deletes, author renames), no query. None with a per-process cache,
+    where other workers would never see the bump.
+    """
+    if not is_shared_cache():
+        return None
+    tag_version, = get_tag_versions(catalog_tag())
+    return str(tag_version)
+
+
+def latest(*timestamps):
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+class ConditionalGetMixin:
+    """
+    For APIView subclasses. A GET handler calls `self.not_modified(...)`
+    as soon as it knows the validators and returns the result if it is not
+    None; the same validators are then put on the full 200 response.
+    """
+
+    def not_modified(self, request, etag, last_modified=None):
+        self._validators = (etag, last_modified)
+        return get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_validators", None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+            # bodies depend on the caller: shared caches must not reuse them
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+        return response
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...services.archive import archive_finished_attempts
+
+
+class Command(BaseCommand):
+    help = (
+        "Move answers of completed / failed attempts to the archive table. "
+        "Meant to run on a schedule (cron, systemd timer)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Archive attempts finished more than this many days ago (default: 30).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Attempts moved per transaction (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=max(options["days"], 0))
+        attempts, answers = archive_finished_attempts(before, max(options["batch_size"], 1))
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {answers} answers of {attempts} finished attempts."
+        ))
@@ -0,0 +1,111 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ...models import Course
+from ...services.tree import TreeWriter, MODULE_LEVEL
+
+
+def build_payload(modules: int, topics: int, questions: int, options: int) -> list[dict]:
+    return [
+        {
+            "title": f"Module {m}",
+            "order": m,
+            "topics": [
+                {
+                    "title": f"Topic {m}.{t}",
+                    "content": "Lorem ipsum " * 20,
+                    "order": t,
+                    "questions": [
+                        {
+                            "text": f"Question {m}.{t}.{q}",
+                            "order": q,
+                            "question_type": "single_choice",
+                            "max_score": 100,
+                            "options": [
+                                {"text": f"Option {o}", "is_correct": o == 0}
+                                for o in range(options)
+                            ],
+                        }
+                        for q in range(questions)
+                    ],
+                }
+                for t in range(topics)
+            ],
+        }
+        for m in range(modules)
+    ]
+
+
+def payload_from_tree(course: Course) -> list[dict]:
+    """
+    Existing tree as an edit payload: every node keeps its id, titles change,
+    the last topic of each module is dropped and one new topic is added.
+    """
+    payload = []
+    for module in course.modules.prefetch_related("topics__questions__options"):
+        topics = [
+            {
+                "id": topic.id,
+                "title": f"{topic.title} (edited)",
+                "order": topic.order,
+                "questions": [
+                    {
+                        "id": question.id,
+                        "text": question.text,
+                        "order": question.order,
+                        "options": [
+                            {"id": option.id, "text": option.text, "is_correct": option.is_correct}
+                            for option in question.options.all()
+                        ],
+                    }
+                    for question in topic.questions.all()
+                ],
+            }
+            for topic in module.topics.all()
+        ][:-1]
+        topics.append({"title": "New topic", "order": len(topics), "questions": []})
+        payload.append({"id": module.id, "title": module.title, "order": module.order, "topics": topics})
+    return payload
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the number of SQL statements TreeWriter issues to create and "
+        "to update course trees of growing size. Runs in a rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1x1x1x2,3x5x5x4,5x10x10x4,10x30x10x4",
+            help="Comma separated MODULESxTOPICSxQUESTIONSxOPTIONS tree shapes.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'tree':>14} {'nodes':>7} {'create':>7} {'update':>7}")
+        for size in options["sizes"].split(","):
+            modules, topics, questions, opts = (int(n) for n in size.split("x"))
+            nodes = modules * (1 + topics * (1 + questions * (1 + opts)))
+
+            with transaction.atomic():
+                course = Course.objects.create(
+                    title=f"Benchmark {size}",
+                    slug=f"benchmark-{uuid.uuid4().hex[:12]}",
+                )
+                payload = build_payload(modules, topics, questions, opts)
+                with CaptureQueriesContext(connection) as created:
+                    TreeWriter().write(MODULE_LEVEL, course, payload, parent_is_new=True)
+
+                edit_payload = payload_from_tree(course)
+                with CaptureQueriesContext(connection) as updated:
+                    TreeWriter().write(MODULE_LEVEL, course, edit_payload)
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f"{size:>14} {nodes:>7} {len(created.captured_queries):>7} "
+                f"{len(updated.captured_queries):>7}"
+            )
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import User
+from ...services.importer import IMPORT_FORMATS, CourseImporter, guess_import_format, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a course from a JSON or NDJSON file (the format of the "
+        "teacher export). Rows are validated and inserted in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--author",
+            required=True,
+            help="Username of the teacher who will own the course.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Records validated and inserted together (default: COURSE_IMPORT_CHUNK_SIZE).",
+        )
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Import the valid rows even if some rows are invalid.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options["author"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['author']!r} does not exist.")
+
+        import_format = options["format"] or guess_import_format(options["path"])
+        importer = CourseImporter(
+            author,
+            chunk_size=options["chunk_size"],
+            skip_invalid=options["skip_invalid"],
+        )
+        try:
+            with open(options["path"], "rb") as stream:
+                summary = importer.run(read_records(stream, import_format))
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in summary["errors"]:
+            self.stderr.write(f"{error['row']}: {json.dumps(error['errors'], default=str)}")
+        if summary["error_count"] > len(summary["errors"]):
+            self.stderr.write(f"... {summary['error_count'] - len(summary['errors'])} more errors")
+
+        if not importer.imported:
+            raise CommandError(f"Nothing imported: {summary['error_count']} invalid rows.")
+
+        created = summary["created"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported course {summary['course_id']}: {created['modules']} modules, "
+            f"{created['topics']} topics, {created['questions']} questions, "
+            f"{created['options']} options ({summary['error_count']} rows skipped)."
+        ))
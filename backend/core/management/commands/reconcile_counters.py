@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import Topic
+from ...services import refresh_question_counts, refresh_progress_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Topic.question_count and TopicProgress answered/correct "
+        "counters from the question and answer tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            help="Only reconcile topics of this course id.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of topics updated per transaction (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        topics = Topic.objects.order_by("pk")
+        if options["course"]:
+            topics = topics.filter(module__course_id=options["course"])
+
+        topic_ids = list(topics.values_list("pk", flat=True))
+        batch_size = max(options["batch_size"], 1)
+
+        topics_updated = 0
+        progress_updated = 0
+        for start in range(0, len(topic_ids), batch_size):
+            batch = topic_ids[start:start + batch_size]
+            with transaction.atomic():
+                topics_updated += refresh_question_counts(batch)
+                progress_updated += refresh_progress_counters(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {topics_updated} topics and {progress_updated} progress rows."
+        ))
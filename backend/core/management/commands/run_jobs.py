@@ -0,0 +1,58 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...services.jobs import claim_next, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (course saves, deletes, imports)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due, then exit.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty (default: 2).",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="Exit after this many jobs (default: no limit).",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Recovered {requeued} stale jobs.")
+
+        try:
+            while True:
+                close_old_connections()
+                job = claim_next(worker_id)
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+                    continue
+
+                job = run_job(job)
+                processed += 1
+                self.stdout.write(f"{job.kind} #{job.pk}: {job.status}")
+                if options["max_jobs"] and processed >= options["max_jobs"]:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
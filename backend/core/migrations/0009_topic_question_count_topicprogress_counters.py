@@ -0,0 +1,61 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_by):
+    counted = (
+        queryset
+        .order_by()
+        .values(group_by)
+        .annotate(n=Count("pk"))
+        .values("n")[:1]
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Topic = apps.get_model("core", "Topic")
+    TopicProgress = apps.get_model("core", "TopicProgress")
+    TopicQuestion = apps.get_model("core", "TopicQuestion")
+    TopicQuestionAnswer = apps.get_model("core", "TopicQuestionAnswer")
+
+    Topic.objects.update(
+        question_count=_count(
+            TopicQuestion.objects.filter(topic=OuterRef("pk")), "topic",
+        ),
+    )
+    answers = TopicQuestionAnswer.objects.filter(
+        user=OuterRef("user"),
+        question__topic=OuterRef("topic"),
+    )
+    TopicProgress.objects.update(
+        answered_count=_count(answers, "user"),
+        correct_count=_count(answers.filter(is_correct=True), "user"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alter_topic_content_alter_topic_time_limit_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of questions, kept by teacher writes'),
+        ),
+        migrations.AddField(
+            model_name='topicprogress',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of answered questions'),
+        ),
+        migrations.AddField(
+            model_name='topicprogress',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of correctly answered questions'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_topic_question_count_topicprogress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Bumped on every structural change; part of cache keys'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Same document as core.services.search.SEARCH_DOCUMENT_SQL, for all rows.
+BACKFILL_SQL = """
+UPDATE core_course AS c SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(c.title, '')), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+        SELECT string_agg(s.title, ' ')
+        FROM (
+            SELECT m.title FROM core_module AS m WHERE m.course_id = c.id
+            UNION ALL
+            SELECT t.title FROM core_topic AS t
+            JOIN core_module AS tm ON tm.id = t.module_id
+            WHERE tm.course_id = c.id
+        ) AS s
+    ), '')), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(c.description, '')), 'C')
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN indexes are PostgreSQL-only; other backends use the icontains fallback.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS core_course_search_vector_gin "
+        "ON core_course USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS core_course_title_trgm "
+        "ON core_course USING gin (title gin_trgm_ops)"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            BACKFILL_SQL,
+            {"config": getattr(settings, "COURSE_SEARCH_CONFIG", "simple")},
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS core_course_search_vector_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS core_course_title_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_course_content_version'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted title/outline/description document (PostgreSQL only)', null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_course_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Last change of the course or its tree; Last-Modified of course responses'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, help_text='Last change of learning progress or enrollments; part of learning ETags'),
+        ),
+    ]
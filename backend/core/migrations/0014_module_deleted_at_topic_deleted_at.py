@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='module',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Soft-deleted, waiting for the background purge', null=True),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Soft-deleted, waiting for the background purge', null=True),
+        ),
+    ]
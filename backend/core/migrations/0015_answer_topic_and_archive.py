@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_answer_topic(apps, schema_editor):
+    TopicQuestion = apps.get_model("core", "TopicQuestion")
+    TopicQuestionAnswer = apps.get_model("core", "TopicQuestionAnswer")
+    TopicQuestionAnswer.objects.filter(topic__isnull=True).update(
+        topic_id=Subquery(
+            TopicQuestion.objects.filter(pk=OuterRef("question_id")).values("topic_id")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_module_deleted_at_topic_deleted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicquestionanswer',
+            name='topic',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='question_answers', to='core.topic'),
+        ),
+        migrations.RunPython(backfill_answer_topic, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='topicquestionanswer',
+            index=models.Index(fields=['user', 'topic'], name='core_answer_user_topic_idx'),
+        ),
+        migrations.CreateModel(
+            name='TopicQuestionAnswerArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_option_ids', models.JSONField(blank=True, default=list)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('score', models.PositiveSmallIntegerField(default=0)),
+                ('answered_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_answers', to='core.topicquestion')),
+                ('topic', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_answers', to='core.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_answers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'topic'], name='core_archive_user_topic_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+POSTGRES_BACKFILL_SQL = """
+UPDATE core_topicquestionanswer AS a SET selected_option_ids = s.ids
+FROM (
+    SELECT topicquestionanswer_id, jsonb_agg(topicquestionoption_id ORDER BY topicquestionoption_id) AS ids
+    FROM core_topicquestionanswer_selected_options
+    GROUP BY topicquestionanswer_id
+) AS s
+WHERE s.topicquestionanswer_id = a.id
+"""
+
+
+def copy_selected_options(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_BACKFILL_SQL)
+        return
+
+    TopicQuestionAnswer = apps.get_model("core", "TopicQuestionAnswer")
+    Through = TopicQuestionAnswer.selected_options.through
+    rows = (
+        Through.objects
+        .order_by("topicquestionanswer_id", "topicquestionoption_id")
+        .values_list("topicquestionanswer_id", "topicquestionoption_id")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    selected = {}
+    for answer_id, option_id in rows:
+        # rows come grouped by answer: flush only between two answers
+        if answer_id not in selected and len(selected) >= BATCH_SIZE:
+            _save_batch(TopicQuestionAnswer, selected)
+            selected = {}
+        selected.setdefault(answer_id, []).append(option_id)
+    _save_batch(TopicQuestionAnswer, selected)
+
+
+def _save_batch(TopicQuestionAnswer, selected):
+    answers = list(TopicQuestionAnswer.objects.filter(pk__in=selected).only("pk"))
+    for answer in answers:
+        answer.selected_option_ids = selected[answer.pk]
+    TopicQuestionAnswer.objects.bulk_update(answers, ["selected_option_ids"])
+
+
+def restore_selected_options(apps, schema_editor):
+    TopicQuestionAnswer = apps.get_model("core", "TopicQuestionAnswer")
+    Through = TopicQuestionAnswer.selected_options.through
+    batch = []
+    answers = (
+        TopicQuestionAnswer.objects
+        .exclude(selected_option_ids=[])
+        .values_list("pk", "selected_option_ids")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for answer_id, option_ids in answers:
+        batch.extend(
+            Through(topicquestionanswer_id=answer_id, topicquestionoption_id=option_id)
+            for option_id in option_ids
+        )
+        if len(batch) >= BATCH_SIZE:
+            Through.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Through.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_answer_topic_and_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicquestionanswer',
+            name='selected_option_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copy_selected_options, restore_selected_options),
+        migrations.RemoveField(
+            model_name='topicquestionanswer',
+            name='selected_options',
+        ),
+    ]
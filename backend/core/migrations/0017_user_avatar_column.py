@@ -0,0 +1,28 @@
+# Migration 0007 only records `avatar` in the model state, for databases
+# that already had the column. Databases built from scratch (tests, new
+# deployments) never got it, so add it wherever it is still missing.
+
+from django.db import migrations
+
+
+def add_missing_avatar_column(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in connection.introspection.get_table_description(cursor, User._meta.db_table)
+        }
+    if "avatar" not in columns:
+        schema_editor.add_field(User, User._meta.get_field("avatar"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_topicquestionanswer_selected_option_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_missing_avatar_column, migrations.RunPython.noop),
+    ]
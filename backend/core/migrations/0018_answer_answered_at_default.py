@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_user_avatar_column'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='topicquestionanswer',
+            name='answered_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
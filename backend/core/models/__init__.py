@@ -11,8 +11,11 @@ from .learning import (
     TopicQuestion,
     TopicQuestionOption,
     TopicQuestionAnswer,
+    TopicQuestionAnswerArchive,
 )
 
+from .jobs import Job
+
 __all__ = [
     "User",
     "Course",
@@ -22,4 +25,6 @@ __all__ = [
     "TopicQuestion",
     "TopicQuestionOption",
     "TopicQuestionAnswer",
+    "TopicQuestionAnswerArchive",
+    "Job",
 ]
\ No newline at end of file
@@ -1,8 +1,19 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 from .user import User
 
 
+class LiveManager(models.Manager):
+    """
+    Default manager of soft-deletable models: hides rows waiting for their
+    background purge. `all_objects` still sees them.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 def course_image_upload_path(instance, filename):
     return f'courses/{instance.slug}/image/{filename}'
 
@@ -25,6 +36,20 @@ class Course(models.Model):
         max_length=500,
         help_text="Course cover image"
     )
+    content_version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Bumped on every structural change; part of cache keys",
+    )
+    content_updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last change of the course or its tree; Last-Modified of course responses",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted title/outline/description document (PostgreSQL only)",
+    )
 
     def __str__(self):
         return self.title
@@ -38,6 +63,15 @@ class Module(models.Model):
     )
     title = models.CharField(max_length=200)
     order = models.PositiveIntegerField(default=0)
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Soft-deleted, waiting for the background purge",
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["order"]
@@ -63,6 +97,20 @@ class Topic(models.Model):
         validators=[MinValueValidator(30)],
         help_text="Time limit for timed tests in seconds (minimum 30, maximum 1800)",
     )
+    question_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of questions, kept by teacher writes",
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Soft-deleted, waiting for the background purge",
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["order"]
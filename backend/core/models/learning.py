@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.utils import timezone
 
 class TopicProgress(models.Model):
     class Status(models.TextChoices):
@@ -40,6 +41,16 @@ class TopicProgress(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     timed_out = models.BooleanField(default=False)
+    answered_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of answered questions",
+    )
+    correct_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of correctly answered questions",
+    )
 
     class Meta:
         unique_together = ("user","topic")
@@ -100,23 +111,85 @@ class TopicQuestionAnswer(models.Model):
         on_delete=models.CASCADE,
         related_name="answers",
     )
-
-    # single/multi choice
-    selected_options = models.ManyToManyField(
-        TopicQuestionOption,
-        blank=True,
-        related_name="answers",
+    # copy of question.topic_id, so per-topic reads skip the question join
+    topic = models.ForeignKey(
+        "Topic",
+        on_delete=models.CASCADE,
+        related_name="question_answers",
+        null=True,
+        editable=False,
+        db_index=False,
     )
 
+    # single/multi choice: sorted option ids, stored inline
+    selected_option_ids = models.JSONField(default=list, blank=True)
+
     is_correct = models.BooleanField(default=False)
     score = models.PositiveSmallIntegerField(
         default=0,
         validators=[MinValueValidator(0), MaxValueValidator(100)],
     )
-    answered_at = models.DateTimeField(auto_now=True)
+    # set by every writer; not auto_now, so restored archives keep their time
+    answered_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("user", "question")
+        indexes = [
+            models.Index(fields=["user", "topic"], name="core_answer_user_topic_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} – Q{self.question_id} ({self.score}%)"
+
+    def save(self, *args, **kwargs):
+        if self.topic_id is None and self.question_id is not None:
+            self.topic_id = (
+                self.question.topic_id
+                if "question" in self._state.fields_cache
+                else TopicQuestion.objects.values_list("topic_id", flat=True).get(pk=self.question_id)
+            )
+        super().save(*args, **kwargs)
+
+    @property
+    def selected_options(self):
+        """
+        Read-only stand-in for the former many-to-many field.
+        """
+        return TopicQuestionOption.objects.filter(pk__in=self.selected_option_ids)
+
+
+class TopicQuestionAnswerArchive(models.Model):
+    """
+    Answers of finished attempts, moved out of the hot answer table by
+    `manage.py archive_answers`. Read by the practice history; selected
+    options are stored inline instead of in an M2M table.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_answers",
+    )
+    question = models.ForeignKey(
+        TopicQuestion,
+        on_delete=models.CASCADE,
+        related_name="archived_answers",
+    )
+    topic = models.ForeignKey(
+        "Topic",
+        on_delete=models.CASCADE,
+        related_name="archived_answers",
+        db_index=False,
+    )
+    selected_option_ids = models.JSONField(default=list, blank=True)
+    is_correct = models.BooleanField(default=False)
+    score = models.PositiveSmallIntegerField(default=0)
+    answered_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "topic"], name="core_archive_user_topic_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.user} – Q{self.question_id} ({self.score}%)"
\ No newline at end of file
+        return f"{self.user} – Q{self.question_id} ({self.score}%, archived)"
\ No newline at end of file
@@ -25,6 +25,13 @@ class User(AbstractUser):
     )
 
     two_factor_enabled = models.BooleanField(default=False)
+
+    progress_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Last change of learning progress or enrollments; part of learning ETags",
+    )
     
     # OAuth fields
     google_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
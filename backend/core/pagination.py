@@ -0,0 +1,66 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.settings import api_settings
+
+
+class CourseCursorPagination(CursorPagination):
+    """
+    Keyset pagination: no COUNT(*) and no OFFSET scan.
+    The ordering comes from the view's OrderingFilter (`?ordering=title`),
+    falling back to `id`.
+    """
+    ordering = "id"
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; clients opt in to cursor mode per
+    request with `?pagination=cursor` (next/previous links keep the flag
+    and carry `?cursor=`).
+
+    Ranked search results (`?search=` without `?ordering=`) always use page
+    numbers: the cursor would re-order them by the view's ordering and
+    lose the rank.
+    """
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_class = CourseCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request) -> bool:
+        params = request.query_params
+        if params.get(api_settings.SEARCH_PARAM) and api_settings.ORDERING_PARAM not in params:
+            return False
+        return (
+            params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for keyset pagination.",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+            *self.cursor_class().get_schema_operation_parameters(view),
+        ]
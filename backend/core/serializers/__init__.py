@@ -12,6 +12,7 @@ from .teacher import (
     TeacherQuestionSerializer,
     TeacherQuestionOptionSerializer,
 )
+from .jobs import JobSerializer
 from .learning import (
     LearningTopicSerializer,
     LearningModuleSerializer,
@@ -35,6 +36,8 @@ __all__ = [
     "TeacherModuleSerializer",
     "TeacherTopicSerializer",
 
+    "JobSerializer",
+
     "LearningTopicSerializer",
     "LearningModuleSerializer",
     "LearningCourseSerializer",
@@ -1,18 +1,27 @@
 from rest_framework import serializers
 from django.conf import settings
 from ..models import Course, Module, Topic
+from ..services import get_course_outline
 
 
 class TopicSerializer(serializers.ModelSerializer):
+    """
+    Outline entry of a topic: no body, only its size. The theory text is
+    loaded on demand from TopicTheoryView. Feed it topics from
+    services.outline.outline_topics() (content deferred, length annotated).
+    """
+    content_length = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Topic
         fields = (
             "id",
             "title",
-            "content",
             "order",
             "is_timed_test",
             "time_limit_seconds",
+            "question_count",
+            "content_length",
         )
 
 
@@ -66,12 +75,17 @@ class CourseListSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or request.user.is_anonymous:
             return False
+        # set by annotate_is_enrolled() in the views
+        enrolled = getattr(obj, "user_is_enrolled", None)
+        if enrolled is not None:
+            return enrolled
         return obj.students.filter(pk=request.user.pk).exists()
 
 
 class CourseDetailSerializer(serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
-    modules = ModuleSerializer(many=True, read_only=True)
+    # Same shape as ModuleSerializer(many=True), served from the outline cache
+    modules = serializers.SerializerMethodField()
     is_enrolled = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
 
@@ -88,6 +102,16 @@ class CourseDetailSerializer(serializers.ModelSerializer):
             "image_url",
         )
 
+    def get_outline(self, obj):
+        # fetched once per serializer, several fields read it
+        outlines = self.__dict__.setdefault("_outlines", {})
+        if obj.pk not in outlines:
+            outlines[obj.pk] = get_course_outline(obj)
+        return outlines[obj.pk]
+
+    def get_modules(self, obj):
+        return self.get_outline(obj)
+
     def get_image_url(self, obj):
         if obj.image:
             request = self.context.get('request')
@@ -108,4 +132,8 @@ class CourseDetailSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or request.user.is_anonymous:
             return False
+        # set by annotate_is_enrolled() in the views
+        enrolled = getattr(obj, "user_is_enrolled", None)
+        if enrolled is not None:
+            return enrolled
         return obj.students.filter(pk=request.user.pk).exists()
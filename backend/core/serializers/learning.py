@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
 from .course import ModuleSerializer, TopicSerializer, CourseDetailSerializer
-from ..models import Topic, TopicProgress, TopicQuestionAnswer, TopicQuestionOption, TopicQuestion
+from ..models import Topic, TopicProgress, TopicQuestionOption, TopicQuestion
 
 
 class LearningTopicSerializer(TopicSerializer):
@@ -9,7 +9,10 @@ class LearningTopicSerializer(TopicSerializer):
     score = serializers.SerializerMethodField()
 
     class Meta(TopicSerializer.Meta):
-        fields = ["id", "title", "order", "status", "score", "is_timed_test", "time_limit_seconds"]
+        fields = [
+            "id", "title", "order", "status", "score",
+            "is_timed_test", "time_limit_seconds", "question_count", "content_length",
+        ]
 
     def _get_progress(self, obj):
         progress_map = self.context.get("progress_map") or {}
@@ -34,8 +37,10 @@ class LearningModuleSerializer(ModuleSerializer):
 
 
 class LearningCourseSerializer(CourseDetailSerializer):
-    modules = LearningModuleSerializer(many=True, read_only=True)
-
+    """
+    Cached course outline with the user's progress merged onto each topic
+    (same shape as LearningModuleSerializer(many=True)).
+    """
     total_topics = serializers.SerializerMethodField()
     completed_topics = serializers.SerializerMethodField()
     progress_percent = serializers.SerializerMethodField()
@@ -47,8 +52,31 @@ class LearningCourseSerializer(CourseDetailSerializer):
             "progress_percent"
         )
 
+    def get_modules(self, obj):
+        progress_map = self.context.get("progress_map") or {}
+        topic_fields = [
+            f for f in LearningTopicSerializer.Meta.fields
+            if f not in ("status", "score")
+        ]
+        modules = []
+        for module in self.get_outline(obj):
+            topics = []
+            for topic in module["topics"]:
+                progress = progress_map.get(topic["id"])
+                item = {f: topic[f] for f in topic_fields}
+                item["status"] = progress.status if progress else TopicProgress.Status.NOT_STARTED
+                item["score"] = progress.score if progress else None
+                topics.append(item)
+            modules.append({
+                "id": module["id"],
+                "title": module["title"],
+                "order": module["order"],
+                "topics": topics,
+            })
+        return modules
+
     def get_total_topics(self, obj):
-        return Topic.objects.filter(module__course=obj).count()
+        return sum(len(module["topics"]) for module in self.get_outline(obj))
 
     def get_completed_topics(self, obj):
         progress_map = self.context.get("progress_map") or {}
@@ -105,14 +133,13 @@ class TopicTheorySerializer(TopicSerializer):
         return TopicProgress.Status.NOT_STARTED
 
     def get_total_questions(self, obj):
-        return TopicQuestion.objects.filter(topic=obj).count()
+        return obj.question_count
 
     def get_answered_questions(self, obj):
-        request = self.context.get("request")
-        user = getattr(request, "user", None)
-        if not user or user.is_anonymous:
+        progress = self.context.get("topic_progress")
+        if not progress:
             return 0
-        return TopicQuestionAnswer.objects.filter(user=user, question__topic=obj, is_correct=True,).count()
+        return progress.correct_count
 
     def get_progress_percent(self, obj):
         total = self.get_total_questions(obj)
@@ -176,9 +203,8 @@ class TopicPracticeHistoryQuestionSerializer(TopicPracticeQuestionSerializer):
         answer = answers_map.get(obj.id)
         if not answer:
             return []
-        return list(
-            answer.selected_options.values_list("id", flat=True)
-        )
+        # live answers and archived ones expose the same attribute
+        return list(answer.selected_option_ids)
 
     def get_is_correct(self, obj):
         """
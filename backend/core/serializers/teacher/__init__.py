@@ -1,12 +1,19 @@
 from .question import TeacherQuestionOptionSerializer, TeacherQuestionSerializer
-from .topic import TeacherTopicSerializer
-from .module import TeacherModuleSerializer
-from .course import TeacherCourseSerializer
+from .topic import TeacherTopicSerializer, TeacherTopicListSerializer
+from .module import TeacherModuleSerializer, TeacherModuleListSerializer
+from .course import TeacherCourseSerializer, TeacherCourseListSerializer
+from .importing import ImportCourseSerializer, ImportModuleSerializer, ImportTopicSerializer
 
 __all__ = [
     "TeacherQuestionOptionSerializer",
     "TeacherQuestionSerializer",
     "TeacherTopicSerializer",
+    "TeacherTopicListSerializer",
     "TeacherModuleSerializer",
+    "TeacherModuleListSerializer",
     "TeacherCourseSerializer",
+    "TeacherCourseListSerializer",
+    "ImportCourseSerializer",
+    "ImportModuleSerializer",
+    "ImportTopicSerializer",
 ]
@@ -0,0 +1,42 @@
+from rest_framework import serializers
+
+from ...models import Course, Module, Topic
+from .question import TeacherQuestionSerializer
+from .topic import TeacherTopicSerializer
+
+
+class ImportCourseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ("title", "description")
+
+
+class ImportModuleSerializer(serializers.ModelSerializer):
+    # id from the source file; topics refer to their module by it
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Module
+        fields = ("id", "title", "order")
+
+
+class ImportTopicSerializer(serializers.ModelSerializer):
+    module_id = serializers.IntegerField()
+    title = serializers.CharField(required=True, allow_blank=False)
+    content = serializers.CharField(required=False, allow_blank=True)
+    questions = TeacherQuestionSerializer(many=True, required=False)
+
+    class Meta:
+        model = Topic
+        fields = (
+            "module_id",
+            "title",
+            "content",
+            "order",
+            "is_timed_test",
+            "time_limit_seconds",
+            "questions",
+        )
+
+    def validate_time_limit_seconds(self, value):
+        return TeacherTopicSerializer.validate_time_limit_seconds(self, value)
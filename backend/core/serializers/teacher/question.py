@@ -1,14 +1,21 @@
 from rest_framework import serializers
+from django.db import transaction
 from ...models.learning import TopicQuestion, TopicQuestionOption
+from ...services import get_topic_course_id, mark_course_changed
+from ...services.tree import TreeWriter, OPTION_LEVEL, QUESTION_LEVEL, reload_tree
 
 
 class TeacherQuestionOptionSerializer(serializers.ModelSerializer):
+    # writable so nested payloads keep ids and TreeWriter can diff them
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = TopicQuestionOption
         fields = ("id", "text", "is_correct")
 
 
 class TeacherQuestionSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
     options = TeacherQuestionOptionSerializer(many=True, required=False)
 
     class Meta:
@@ -22,40 +29,17 @@ class TeacherQuestionSerializer(serializers.ModelSerializer):
             "options",
         )
 
+    @transaction.atomic
     def create(self, validated_data):
+        validated_data.pop('id', None)
         options_data = validated_data.pop('options', [])
         question = TopicQuestion.objects.create(**validated_data)
-        for option_data in options_data:
-            TopicQuestionOption.objects.create(question=question, **option_data)
-        return question
+        TreeWriter().write(OPTION_LEVEL, question, options_data, parent_is_new=True)
+        mark_course_changed(get_topic_course_id(question.topic_id))
+        return reload_tree(question)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        options_data = validated_data.pop('options', None)
-        
-        instance.text = validated_data.get('text', instance.text)
-        instance.order = validated_data.get('order', instance.order)
-        instance.question_type = validated_data.get('question_type', instance.question_type)
-        instance.max_score = validated_data.get('max_score', instance.max_score)
-        instance.save()
-        
-        if options_data is not None:
-            existing_option_ids = set(instance.options.values_list('id', flat=True))
-            updated_option_ids = set()
-            
-            for option_data in options_data:
-                option_id = option_data.get('id')
-                if option_id and instance.options.filter(id=option_id).exists():
-                    option = instance.options.get(id=option_id)
-                    option.text = option_data.get('text', option.text)
-                    option.is_correct = option_data.get('is_correct', option.is_correct)
-                    option.save()
-                    updated_option_ids.add(option_id)
-                else:
-                    option_data.pop('id', None)
-                    TopicQuestionOption.objects.create(question=instance, **option_data)
-            
-            options_to_delete = existing_option_ids - updated_option_ids
-            if options_to_delete:
-                instance.options.filter(id__in=options_to_delete).delete()
-        
-        return instance
+        TreeWriter().update_node(QUESTION_LEVEL, instance, validated_data)
+        mark_course_changed(get_topic_course_id(instance.topic_id))
+        return reload_tree(instance)
@@ -1,10 +1,14 @@
 from rest_framework import serializers
+from django.db import transaction
 from ...models import Topic, Module
-from ...models.learning import TopicQuestion, TopicQuestionOption
+from ...services import refresh_topic_counters, mark_course_changed
+from ...services.tree import TreeWriter, QUESTION_LEVEL, TOPIC_LEVEL, reload_tree
 from .question import TeacherQuestionSerializer
 
 
 class TeacherTopicSerializer(serializers.ModelSerializer):
+    # writable so nested payloads keep ids and TreeWriter can diff them
+    id = serializers.IntegerField(required=False)
     questions = TeacherQuestionSerializer(many=True, required=False)
     title = serializers.CharField(required=True, allow_blank=False)
     content = serializers.CharField(required=False, allow_blank=True)
@@ -39,59 +43,45 @@ class TeacherTopicSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         # When creating a new topic, module is required
-        if self.instance is None and 'module' not in attrs:
+        # (nested under a module or course, the parent provides it)
+        if self.instance is None and self.parent is None and 'module' not in attrs:
             raise serializers.ValidationError({"module": "Module is required when creating a topic."})
         return attrs
 
+    @transaction.atomic
     def create(self, validated_data):
+        validated_data.pop('id', None)
         questions_data = validated_data.pop('questions', [])
         if 'module' not in validated_data:
             raise serializers.ValidationError({"module": "Module is required."})
         topic = Topic.objects.create(**validated_data)
-        for question_data in questions_data:
-            options_data = question_data.pop('options', [])
-            question = TopicQuestion.objects.create(topic=topic, **question_data)
-            for option_data in options_data:
-                TopicQuestionOption.objects.create(question=question, **option_data)
-        return topic
+        TreeWriter().write(QUESTION_LEVEL, topic, questions_data, parent_is_new=True)
+        refresh_topic_counters([topic.pk])
+        mark_course_changed(topic.module.course_id)
+        return reload_tree(topic)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        questions_data = validated_data.pop('questions', None)
-        
-        instance.title = validated_data.get('title', instance.title)
-        instance.content = validated_data.get('content', instance.content)
-        instance.order = validated_data.get('order', instance.order)
-        instance.is_timed_test = validated_data.get('is_timed_test', instance.is_timed_test)
-        time_limit = validated_data.get('time_limit_seconds', instance.time_limit_seconds)
-        instance.time_limit_seconds = time_limit
-        instance.save()
-        
-        if questions_data is not None:
-            existing_question_ids = set(instance.questions.values_list('id', flat=True))
-            updated_question_ids = set()
-            
-            for question_data in questions_data:
-                question_id = question_data.get('id')
-                if question_id and instance.questions.filter(id=question_id).exists():
-                    question = instance.questions.get(id=question_id)
-                    question_serializer = TeacherQuestionSerializer(question, data=question_data, partial=True)
-                    question_serializer.is_valid(raise_exception=True)
-                    question_serializer.save()
-                    updated_question_ids.add(question_id)
-                else:
-                    question_data.pop('id', None)
-                    options_data = question_data.pop('options', [])
-                    question = TopicQuestion.objects.create(topic=instance, **question_data)
-                    for option_data in options_data:
-                        option_data.pop('id', None)
-                        TopicQuestionOption.objects.create(question=question, **option_data)
-            
-            questions_to_delete = existing_question_ids - updated_question_ids
-            if questions_to_delete:
-                instance.questions.filter(id__in=questions_to_delete).delete()
-        
-        # Reload instance from database with all related data
-        from ...models import Topic
-        instance = Topic.objects.prefetch_related('questions__options').get(pk=instance.pk)
-        
-        return instance
+        TreeWriter().update_node(TOPIC_LEVEL, instance, validated_data)
+        if validated_data.get('questions') is not None:
+            refresh_topic_counters([instance.pk])
+        mark_course_changed(instance.module.course_id)
+        return reload_tree(instance)
+
+
+class TeacherTopicListSerializer(serializers.ModelSerializer):
+    """
+    Topic card for list endpoints: no content, no questions.
+    """
+    class Meta:
+        model = Topic
+        fields = (
+            "id",
+            "module",
+            "title",
+            "order",
+            "is_timed_test",
+            "time_limit_seconds",
+            "question_count",
+        )
+        read_only_fields = fields
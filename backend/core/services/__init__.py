@@ -0,0 +1,31 @@
+from .counters import (
+    refresh_question_counts,
+    refresh_progress_counters,
+    refresh_topic_counters,
+    shift_answer_counters,
+)
+from .outline import get_course_outline
+from .search import refresh_course_search_document
+from .content import mark_course_changed
+from .progress import mark_progress_changed
+from .access import (
+    get_topic_course_id,
+    get_enrolled_course_ids,
+    invalidate_enrolled_courses,
+    is_enrolled,
+)
+
+__all__ = [
+    "refresh_question_counts",
+    "refresh_progress_counters",
+    "refresh_topic_counters",
+    "shift_answer_counters",
+    "get_course_outline",
+    "refresh_course_search_document",
+    "mark_course_changed",
+    "mark_progress_changed",
+    "get_topic_course_id",
+    "get_enrolled_course_ids",
+    "invalidate_enrolled_courses",
+    "is_enrolled",
+]
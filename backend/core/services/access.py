@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from ..cache import make_key
+from ..models import Topic, User
+
+
+def _enrollment_timeout() -> int:
+    return getattr(settings, "ENROLLMENT_CACHE_TIMEOUT", 60 * 60)
+
+
+def _structure_timeout() -> int:
+    return getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def topic_course_key(topic_id) -> str:
+    return make_key("topic-course", topic_id)
+
+
+def enrolled_courses_key(user_id) -> str:
+    return make_key("enrolled-courses", user_id)
+
+
+def get_topic_course_id(topic_id) -> int | None:
+    """
+    Course id of a topic. Structural, so it is cached for a long time;
+    unknown topics are not cached.
+    """
+    key = topic_course_key(topic_id)
+    course_id = cache.get(key)
+    if course_id is None:
+        course_id = (
+            Topic.objects
+            .filter(pk=topic_id)
+            .values_list("module__course_id", flat=True)
+            .first()
+        )
+        if course_id is not None:
+            cache.set(key, course_id, _structure_timeout())
+    return course_id
+
+
+def get_enrolled_course_ids(user) -> frozenset:
+    """
+    Course ids the user is enrolled in: memoized on the user object for the
+    request, cached across requests, dropped by invalidate_enrolled_courses().
+    """
+    memo = getattr(user, "_enrolled_course_ids", None)
+    if memo is not None:
+        return memo
+
+    key = enrolled_courses_key(user.pk)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = frozenset(
+            User.enrolled_courses.through.objects
+            .filter(user_id=user.pk)
+            .values_list("course_id", flat=True)
+        )
+        cache.set(key, course_ids, _enrollment_timeout())
+    user._enrolled_course_ids = course_ids
+    return course_ids
+
+
+def invalidate_enrolled_courses(user) -> None:
+    cache.delete(enrolled_courses_key(user.pk))
+    if hasattr(user, "_enrolled_course_ids"):
+        del user._enrolled_course_ids
+
+
+def invalidate_topic_course(*topic_ids) -> None:
+    cache.delete_many([topic_course_key(topic_id) for topic_id in topic_ids])
+
+
+def is_enrolled(user, course_id) -> bool:
+    return course_id in get_enrolled_course_ids(user)
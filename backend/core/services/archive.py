@@ -0,0 +1,132 @@
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from ..models import TopicProgress, TopicQuestionAnswer, TopicQuestionAnswerArchive
+
+FINISHED_STATUSES = (TopicProgress.Status.COMPLETED, TopicProgress.Status.FAILED)
+ARCHIVED_FIELDS = (
+    "id", "user_id", "question_id", "topic_id",
+    "selected_option_ids", "is_correct", "score", "answered_at",
+)
+
+
+def finished_attempts(before):
+    """
+    (user_id, topic_id) of attempts finished before `before` that still
+    have answers in the live table.
+    """
+    live_answers = TopicQuestionAnswer.objects.filter(
+        user=OuterRef("user"),
+        topic=OuterRef("topic"),
+    )
+    return (
+        TopicProgress.objects
+        .filter(status__in=FINISHED_STATUSES, completed_at__lt=before)
+        .filter(Exists(live_answers))
+        .order_by("pk")
+        .values_list("user_id", "topic_id")
+    )
+
+
+def _attempts_filter(attempts) -> Q:
+    return reduce(or_, (Q(user_id=user_id, topic_id=topic_id) for user_id, topic_id in attempts))
+
+
+@transaction.atomic
+def archive_attempts(attempts, before) -> int:
+    """
+    Move the answers of the given (user_id, topic_id) attempts to the
+    archive table: one SELECT, one bulk INSERT, one DELETE.
+
+    The progress rows are locked and checked again first: an attempt
+    reopened since it was listed (see restore_archived_answers) stays live.
+    """
+    if not attempts:
+        return 0
+    attempts = list(
+        TopicProgress.objects
+        .select_for_update()
+        .filter(_attempts_filter(attempts))
+        .filter(status__in=FINISHED_STATUSES, completed_at__lt=before)
+        .values_list("user_id", "topic_id")
+    )
+    if not attempts:
+        return 0
+    answers = list(
+        TopicQuestionAnswer.objects
+        .filter(_attempts_filter(attempts))
+        .values(*ARCHIVED_FIELDS)
+    )
+    if not answers:
+        return 0
+
+    answer_ids = [answer["id"] for answer in answers]
+    TopicQuestionAnswerArchive.objects.bulk_create(
+        TopicQuestionAnswerArchive(
+            user_id=answer["user_id"],
+            question_id=answer["question_id"],
+            topic_id=answer["topic_id"],
+            selected_option_ids=answer["selected_option_ids"],
+            is_correct=answer["is_correct"],
+            score=answer["score"],
+            answered_at=answer["answered_at"],
+        )
+        for answer in answers
+    )
+    TopicQuestionAnswer.objects.filter(pk__in=answer_ids)._raw_delete(TopicQuestionAnswer.objects.db)
+    return len(answers)
+
+
+def archive_finished_attempts(before, batch_size: int = 500) -> tuple[int, int]:
+    """
+    Archive every attempt finished before `before`, `batch_size` attempts
+    per transaction. Returns (attempts, answers) moved.
+    """
+    attempts_moved = 0
+    answers_moved = 0
+    while True:
+        batch = list(finished_attempts(before)[:batch_size])
+        if not batch:
+            return attempts_moved, answers_moved
+        attempts_moved += len(batch)
+        answers_moved += archive_attempts(batch, before)
+
+
+def restore_archived_answers(user_id, topic_id) -> int:
+    """
+    Move the archived answers of a finished attempt back to the live table
+    before it is written to again (a question was added, the student goes
+    on), so the answers of one attempt are never split between the two
+    tables. Call it with the progress row locked. A live answer to the same
+    question wins. One SELECT, and an INSERT and a DELETE if anything was
+    archived.
+    """
+    archived = list(
+        TopicQuestionAnswerArchive.objects
+        .filter(user_id=user_id, topic_id=topic_id)
+        .values(*ARCHIVED_FIELDS)
+    )
+    if not archived:
+        return 0
+    TopicQuestionAnswer.objects.bulk_create(
+        [
+            TopicQuestionAnswer(
+                user_id=answer["user_id"],
+                question_id=answer["question_id"],
+                topic_id=answer["topic_id"],
+                selected_option_ids=answer["selected_option_ids"],
+                is_correct=answer["is_correct"],
+                score=answer["score"],
+                answered_at=answer["answered_at"],
+            )
+            for answer in archived
+        ],
+        ignore_conflicts=True,
+    )
+    TopicQuestionAnswerArchive.objects.filter(
+        pk__in=[answer["id"] for answer in archived],
+    )._raw_delete(TopicQuestionAnswerArchive.objects.db)
+    return len(archived)
@@ -0,0 +1,20 @@
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Course
+from .search import refresh_course_search_document
+
+
+def mark_course_changed(course_id) -> None:
+    """
+    Called after every teacher write to a course tree.
+    Bumps the content version (cached outlines keyed by the old version
+    are never read again, ETags change) and rebuilds the search document.
+    """
+    if course_id is None:
+        return
+    Course.objects.filter(pk=course_id).update(
+        content_version=F("content_version") + 1,
+        content_updated_at=timezone.now(),
+    )
+    refresh_course_search_document(course_id)
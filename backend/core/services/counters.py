@@ -0,0 +1,87 @@
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models import Topic, TopicProgress, TopicQuestion, TopicQuestionAnswer, TopicQuestionAnswerArchive
+
+
+def count_subquery(queryset, group_by: str):
+    """
+    Correlated COUNT(*) usable in annotate() / update(); 0 when no rows match.
+    """
+    counted = (
+        queryset
+        .order_by()
+        .values(group_by)
+        .annotate(n=Count("pk"))
+        .values("n")[:1]
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def refresh_question_counts(topic_ids) -> int:
+    """
+    Recompute Topic.question_count for the given topics in one UPDATE.
+    `topic_ids` may be a list or a values_list queryset (sent as a subquery).
+    """
+    return Topic.objects.filter(pk__in=topic_ids).update(
+        question_count=count_subquery(
+            TopicQuestion.objects.filter(topic=OuterRef("pk")), "topic",
+        ),
+    )
+
+
+def refresh_progress_counters(topic_ids) -> int:
+    """
+    Recompute answered / correct counters of every progress row
+    on the given topics in one UPDATE, live and archived answers together
+    (one per question: a live answer shadows an archived one).
+    """
+    answers = TopicQuestionAnswer.objects.filter(
+        user=OuterRef("user"),
+        topic=OuterRef("topic"),
+    )
+    archived = TopicQuestionAnswerArchive.objects.filter(
+        user=OuterRef("user"),
+        topic=OuterRef("topic"),
+    ).exclude(
+        Exists(TopicQuestionAnswer.objects.filter(
+            user_id=OuterRef("user_id"),
+            question_id=OuterRef("question_id"),
+        )),
+    )
+    return TopicProgress.objects.filter(topic_id__in=topic_ids).update(
+        answered_count=count_subquery(answers, "user") + count_subquery(archived, "user"),
+        correct_count=(
+            count_subquery(answers.filter(is_correct=True), "user")
+            + count_subquery(archived.filter(is_correct=True), "user")
+        ),
+    )
+
+
+def refresh_topic_counters(topic_ids) -> None:
+    """
+    Called after teacher writes that add or remove questions
+    (removed questions cascade to answers, so progress drifts too).
+    """
+    refresh_question_counts(topic_ids)
+    refresh_progress_counters(topic_ids)
+
+
+def shift_answer_counters(progress: TopicProgress, created: bool, was_correct: bool, is_correct: bool) -> dict:
+    """
+    Apply one answer write to the in-memory counters and return the
+    matching F() updates for the row (empty when nothing moved), so the
+    caller can send them with its own progress UPDATE.
+    """
+    answered_delta = 1 if created else 0
+    correct_delta = int(is_correct) - int(was_correct)
+    if not answered_delta and not correct_delta:
+        return {}
+
+    progress.answered_count += answered_delta
+    progress.correct_count += correct_delta
+    return {
+        "answered_count": F("answered_count") + answered_delta,
+        "correct_count": F("correct_count") + correct_delta,
+    }
+
@@ -0,0 +1,162 @@
+"""
+Fast deletes of course subtrees.
+
+Django's delete() collects every dependent row (questions, options,
+answers) into Python before deleting, which
+does not scale to topics with large answer histories. These helpers
+delete bottom-up with plain DELETE ... WHERE id IN (...) statements,
+a chunk of ids at a time, each chunk in its own short transaction.
+No per-row signals are sent; caches are invalidated here instead.
+
+Inside a request's transaction the chunks would only be savepoints, so
+request paths soft-delete modules and topics and leave the purge to a
+background job.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    Course,
+    Module,
+    Topic,
+    TopicProgress,
+    TopicQuestion,
+    TopicQuestionAnswer,
+    TopicQuestionAnswerArchive,
+    TopicQuestionOption,
+)
+from .access import invalidate_topic_course
+from .content import mark_course_changed
+from .jobs import enqueue
+
+
+def delete_chunk_size() -> int:
+    return getattr(settings, "COURSE_DELETE_CHUNK_SIZE", 2000)
+
+
+def _raw_delete(queryset) -> int:
+    # a single DELETE statement: no collection, no signals, no cascades
+    return queryset._raw_delete(queryset.db)
+
+
+def _delete_in_chunks(queryset, chunk_size: int) -> int:
+    """
+    Delete the rows of `queryset` `chunk_size` at a time.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            deleted += _raw_delete(model._base_manager.filter(pk__in=ids))
+
+
+def purge_questions(questions, chunk_size: int | None = None) -> int:
+    """
+    Answers, archived answers, options and the questions
+    themselves. `questions` is a TopicQuestion queryset.
+    """
+    chunk_size = chunk_size or delete_chunk_size()
+    question_ids = questions.values("pk")
+    _delete_in_chunks(
+        TopicQuestionAnswer.objects.filter(question_id__in=question_ids),
+        chunk_size,
+    )
+    _delete_in_chunks(
+        TopicQuestionAnswerArchive.objects.filter(question_id__in=question_ids),
+        chunk_size,
+    )
+    _delete_in_chunks(
+        TopicQuestionOption.objects.filter(question_id__in=question_ids),
+        chunk_size,
+    )
+    return _delete_in_chunks(questions, chunk_size)
+
+
+def purge_topics(topic_ids, chunk_size: int | None = None) -> int:
+    """
+    Topics with their progress rows and question subtrees, soft-deleted or not.
+    The caller marks the course changed.
+    """
+    chunk_size = chunk_size or delete_chunk_size()
+    topic_ids = list(topic_ids)
+    if not topic_ids:
+        return 0
+    _delete_in_chunks(TopicProgress.objects.filter(topic_id__in=topic_ids), chunk_size)
+    purge_questions(TopicQuestion.objects.filter(topic_id__in=topic_ids), chunk_size)
+    deleted = _delete_in_chunks(Topic.all_objects.filter(pk__in=topic_ids), chunk_size)
+    invalidate_topic_course(*topic_ids)
+    return deleted
+
+
+def purge_modules(module_ids, chunk_size: int | None = None) -> int:
+    module_ids = list(module_ids)
+    if not module_ids:
+        return 0
+    purge_topics(
+        Topic.all_objects.filter(module_id__in=module_ids).values_list("pk", flat=True),
+        chunk_size,
+    )
+    return _delete_in_chunks(Module.all_objects.filter(pk__in=module_ids), chunk_size or delete_chunk_size())
+
+
+def purge_course(course_id, chunk_size: int | None = None) -> None:
+    purge_modules(
+        Module.all_objects.filter(course_id=course_id).values_list("pk", flat=True),
+        chunk_size,
+    )
+    # only enrollments are left; Django deletes those in one statement
+    Course.objects.filter(pk=course_id).delete()
+
+
+def delete_topic(topic: Topic) -> None:
+    course_id = Module.all_objects.filter(pk=topic.module_id).values_list("course_id", flat=True).first()
+    purge_topics([topic.pk])
+    mark_course_changed(course_id)
+
+
+def delete_module(module: Module) -> None:
+    purge_modules([module.pk])
+    mark_course_changed(module.course_id)
+
+
+def soft_delete_topics(topic_ids) -> int:
+    """
+    Hide topics at once (a single UPDATE); purge_topics removes them later.
+    """
+    topic_ids = list(topic_ids)
+    hidden = Topic.objects.filter(pk__in=topic_ids).update(deleted_at=timezone.now())
+    invalidate_topic_course(*topic_ids)
+    return hidden
+
+
+def soft_delete_modules(module_ids) -> int:
+    module_ids = list(module_ids)
+    now = timezone.now()
+    topic_ids = list(Topic.objects.filter(module_id__in=module_ids).values_list("pk", flat=True))
+    Topic.objects.filter(pk__in=topic_ids).update(deleted_at=now)
+    invalidate_topic_course(*topic_ids)
+    return Module.objects.filter(pk__in=module_ids).update(deleted_at=now)
+
+
+def delete_rows(model, ids) -> None:
+    """
+    Remove tree rows by id, for TreeWriter. Modules and topics are hidden
+    at once and purged by a job that runs after the write commits; the
+    remaining levels are small enough to delete in place (options have no
+    dependents and use the regular delete()).
+    """
+    ids = list(ids)
+    if model is Module:
+        soft_delete_modules(ids)
+        enqueue("module.purge", {"ids": ids})
+    elif model is Topic:
+        soft_delete_topics(ids)
+        enqueue("topic.purge", {"ids": ids})
+    elif model is TopicQuestion:
+        purge_questions(TopicQuestion.objects.filter(pk__in=ids))
+    else:
+        model.objects.filter(pk__in=ids).delete()
@@ -0,0 +1,141 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+
+from ..models import Course, Module, Topic, TopicQuestion, TopicQuestionOption
+from .tree import MODULE_LEVEL, OPTION_LEVEL, QUESTION_LEVEL, TOPIC_LEVEL
+
+EXPORT_JSON = "json"
+EXPORT_NDJSON = "ndjson"
+EXPORT_FORMATS = (EXPORT_JSON, EXPORT_NDJSON)
+
+# Same keys as the teacher payloads, so an export can be posted back / imported.
+COURSE_EXPORT_FIELDS = ("id", "title", "slug", "description")
+MODULE_EXPORT_FIELDS = ("id", *MODULE_LEVEL.fields)
+TOPIC_EXPORT_FIELDS = ("id", *TOPIC_LEVEL.fields)
+QUESTION_EXPORT_FIELDS = ("id", *QUESTION_LEVEL.fields)
+OPTION_EXPORT_FIELDS = ("id", *OPTION_LEVEL.fields)
+
+
+def export_chunk_size() -> int:
+    return getattr(settings, "COURSE_EXPORT_CHUNK_SIZE", 200)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _iter_topic_batches(course_id, chunk_size):
+    """
+    Topics of the course in outline order, read through a server-side
+    cursor, `chunk_size` topics at a time, each with its questions and
+    options attached (two extra queries per batch).
+    """
+    topics = (
+        Topic.objects
+        .filter(module__course_id=course_id)
+        .order_by("module__order", "module_id", "order", "id")
+        .values("module_id", *TOPIC_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        batch = list(islice(topics, chunk_size))
+        if not batch:
+            return
+
+        questions_by_topic = {t["id"]: [] for t in batch}
+        questions_by_id = {}
+        questions = (
+            TopicQuestion.objects
+            .filter(topic_id__in=questions_by_topic)
+            .order_by("order", "id")
+            .values("topic_id", *QUESTION_EXPORT_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        for question in questions:
+            question["options"] = []
+            questions_by_topic[question.pop("topic_id")].append(question)
+            questions_by_id[question["id"]] = question
+
+        options = (
+            TopicQuestionOption.objects
+            .filter(question__topic_id__in=questions_by_topic)
+            .order_by("id")
+            .values("question_id", *OPTION_EXPORT_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        for option in options:
+            questions_by_id[option.pop("question_id")]["options"].append(option)
+
+        for topic in batch:
+            topic["questions"] = questions_by_topic[topic["id"]]
+        yield batch
+
+
+def _iter_modules_with_topics(course_id, chunk_size):
+    """
+    (module, topic iterator) pairs in outline order. Only one batch of
+    topics is held in memory at a time.
+    """
+    modules = list(
+        Module.objects
+        .filter(course_id=course_id)
+        .order_by("order", "id")
+        .values(*MODULE_EXPORT_FIELDS)
+    )
+    topics = (topic for batch in _iter_topic_batches(course_id, chunk_size) for topic in batch)
+    pending = next(topics, None)
+
+    for module in modules:
+        def module_topics(module_id=module["id"]):
+            nonlocal pending
+            while pending is not None and pending["module_id"] == module_id:
+                topic, pending = pending, next(topics, None)
+                topic.pop("module_id")
+                yield topic
+
+        yield module, module_topics()
+
+
+def _course_header(course: Course) -> dict:
+    return {field: getattr(course, field) for field in COURSE_EXPORT_FIELDS}
+
+
+def iter_course_json(course: Course, chunk_size: int | None = None):
+    """
+    The course tree as one JSON document, yielded piece by piece:
+    course fields, then modules -> topics -> questions -> options.
+    """
+    chunk_size = chunk_size or export_chunk_size()
+    header = _dumps(_course_header(course))
+    yield header[:-1] + ',"modules":['
+
+    for module_index, (module, topics) in enumerate(_iter_modules_with_topics(course.pk, chunk_size)):
+        module_header = _dumps(module)
+        yield ("," if module_index else "") + module_header[:-1] + ',"topics":['
+        for topic_index, topic in enumerate(topics):
+            yield ("," if topic_index else "") + _dumps(topic)
+        yield "]}"
+
+    yield "]}\n"
+
+
+def iter_course_ndjson(course: Course, chunk_size: int | None = None):
+    """
+    One JSON record per line: the course, then each module followed by its
+    topics (a topic line carries its questions and options).
+    """
+    chunk_size = chunk_size or export_chunk_size()
+    yield _dumps({"type": "course", **_course_header(course)}) + "\n"
+
+    for module, topics in _iter_modules_with_topics(course.pk, chunk_size):
+        yield _dumps({"type": "module", **module}) + "\n"
+        for topic in topics:
+            yield _dumps({"type": "topic", "module_id": module["id"], **topic}) + "\n"
+
+
+def iter_course_export(course: Course, export_format: str = EXPORT_JSON, chunk_size: int | None = None):
+    if export_format == EXPORT_NDJSON:
+        return iter_course_ndjson(course, chunk_size)
+    return iter_course_json(course, chunk_size)
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from ..cache import make_key
+from ..models import TopicQuestion, TopicQuestionOption
+
+
+class CompiledQuestion:
+    """
+    Everything grading needs from a question: its option ids (sorted),
+    a bitmask of the correct ones (bit i <-> option_ids[i]) and its type.
+    Small and immutable, so it is cached as a plain tuple.
+    """
+
+    def __init__(self, question_type: str, option_ids, correct_mask: int, max_score: int):
+        self.question_type = question_type
+        self.option_ids = tuple(option_ids)
+        self.correct_mask = correct_mask
+        self.max_score = max_score
+        self._bits = {option_id: 1 << i for i, option_id in enumerate(self.option_ids)}
+
+    @classmethod
+    def from_db(cls, question: TopicQuestion) -> "CompiledQuestion":
+        rows = (
+            TopicQuestionOption.objects
+            .filter(question_id=question.pk)
+            .order_by("id")
+            .values_list("id", "is_correct")
+        )
+        option_ids = []
+        correct_mask = 0
+        for i, (option_id, is_correct) in enumerate(rows):
+            option_ids.append(option_id)
+            if is_correct:
+                correct_mask |= 1 << i
+        return cls(question.question_type, option_ids, correct_mask, question.max_score)
+
+    def to_cache(self) -> tuple:
+        return (self.question_type, self.option_ids, self.correct_mask, self.max_score)
+
+    @classmethod
+    def from_cache(cls, value: tuple) -> "CompiledQuestion":
+        return cls(*value)
+
+    def has_options(self, option_ids) -> bool:
+        return all(option_id in self._bits for option_id in option_ids)
+
+    def mask(self, option_ids) -> int:
+        mask = 0
+        for option_id in option_ids:
+            mask |= self._bits[option_id]
+        return mask
+
+    def is_correct(self, option_ids) -> bool:
+        # the selected set must equal the (non-empty) set of correct options
+        return bool(self.correct_mask) and self.mask(option_ids) == self.correct_mask
+
+    def score(self, option_ids) -> int:
+        return self.max_score if self.is_correct(option_ids) else 0
+
+
+def grading_cache_key(question_id, content_version) -> str:
+    return make_key("grading", question_id, f"v{content_version}")
+
+
+def get_compiled_question(question: TopicQuestion, content_version: int) -> CompiledQuestion:
+    """
+    Compiled question for the course's current content version. Teacher
+    writes bump that version (mark_course_changed), so edited options are
+    never graded from a stale entry.
+    """
+    key = grading_cache_key(question.pk, content_version)
+    cached = cache.get(key)
+    if cached is not None:
+        return CompiledQuestion.from_cache(cached)
+    compiled = CompiledQuestion.from_db(question)
+    cache.set(
+        key,
+        compiled.to_cache(),
+        getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 60 * 60 * 24),
+    )
+    return compiled
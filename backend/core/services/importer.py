@@ -0,0 +1,246 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from ..models import Course, Module, Topic, TopicQuestion, TopicQuestionOption
+from ..serializers.teacher.importing import (
+    ImportCourseSerializer,
+    ImportModuleSerializer,
+    ImportTopicSerializer,
+)
+from .content import mark_course_changed
+from .counters import refresh_topic_counters
+from .export import EXPORT_JSON, EXPORT_NDJSON
+from .slugs import save_course_with_slug
+from .tree import TOPIC_LEVEL, TreeWriter
+
+IMPORT_FORMATS = (EXPORT_JSON, EXPORT_NDJSON)
+
+# Only the first errors are kept in the report; the total is always counted.
+MAX_REPORTED_ERRORS = 200
+
+
+def import_chunk_size() -> int:
+    return getattr(settings, "COURSE_IMPORT_CHUNK_SIZE", 500)
+
+
+def guess_import_format(filename: str | None) -> str:
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return EXPORT_NDJSON
+    return EXPORT_JSON
+
+
+def read_ndjson_records(stream):
+    """
+    (row, record) pairs from an NDJSON stream, read line by line.
+    Undecodable lines come back as (row, None).
+    """
+    for line_number, line in enumerate(stream, start=1):
+        row = f"line {line_number}"
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8")
+            except UnicodeDecodeError:
+                yield row, None
+                continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield row, record
+
+
+def read_json_records(stream):
+    """
+    (row, record) pairs from a JSON document: either the nested course
+    payload of the teacher API / JSON export, or a list of NDJSON-style
+    records. The document itself is parsed in one go.
+    """
+    try:
+        document = json.load(stream)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        yield "document", None
+        return
+
+    if isinstance(document, list):
+        for index, record in enumerate(document):
+            yield f"[{index}]", record
+        return
+    if not isinstance(document, dict):
+        yield "document", None
+        return
+
+    modules = document.get("modules") or []
+    yield "course", {"type": "course", **{k: v for k, v in document.items() if k != "modules"}}
+    for module_index, module in enumerate(modules):
+        row = f"modules[{module_index}]"
+        if not isinstance(module, dict):
+            yield row, None
+            continue
+        # positions stand in for ids, the nesting already says who owns what
+        yield row, {"type": "module", **module, "id": module_index}
+        for topic_index, topic in enumerate(module.get("topics") or []):
+            record = {"type": "topic", **topic, "module_id": module_index} if isinstance(topic, dict) else None
+            yield f"{row}.topics[{topic_index}]", record
+
+
+def read_records(stream, import_format: str = EXPORT_JSON):
+    if import_format == EXPORT_NDJSON:
+        return read_ndjson_records(stream)
+    return read_json_records(stream)
+
+
+class CourseImporter:
+    """
+    Creates one course from a stream of records: a `course` record first,
+    then `module` records and `topic` records (questions and options nested
+    in the topic, `module_id` pointing at a module record's `id`).
+
+    Records are validated and inserted `chunk_size` at a time with one bulk
+    INSERT per tree level. Invalid rows are reported with their position.
+    Without `skip_invalid` any error rolls the whole import back.
+    """
+
+    def __init__(self, author, chunk_size: int | None = None, skip_invalid: bool = False):
+        self.author = author
+        self.chunk_size = max(chunk_size or import_chunk_size(), 1)
+        self.skip_invalid = skip_invalid
+
+        self.course = None
+        self.modules = {}
+        self.pending_modules = []
+        self.pending_topics = []
+        self.writer = TreeWriter()
+        self.errors = []
+        self.error_count = 0
+
+        self._module_validator = ImportModuleSerializer()
+        self._topic_validator = ImportTopicSerializer()
+
+    def run(self, records) -> dict:
+        with transaction.atomic():
+            for row, record in records:
+                self._add(row, record)
+            self._flush()
+
+            if self.course is None and not self.error_count:
+                self._error("document", "No course record found.")
+
+            if self.course is None or (self.error_count and not self.skip_invalid):
+                transaction.set_rollback(True)
+                self.course = None
+            else:
+                refresh_topic_counters(
+                    Topic.objects.filter(module__course=self.course).values_list("pk", flat=True)
+                )
+                mark_course_changed(self.course.pk)
+        return self.summary()
+
+    @property
+    def imported(self) -> bool:
+        return self.course is not None
+
+    def summary(self) -> dict:
+        created = self.writer.created
+        return {
+            "course_id": self.course.pk if self.course else None,
+            "imported": self.imported,
+            "created": {
+                "modules": len(self.modules) if self.imported else 0,
+                "topics": len(created[Topic]) if self.imported else 0,
+                "questions": len(created[TopicQuestion]) if self.imported else 0,
+                "options": len(created[TopicQuestionOption]) if self.imported else 0,
+            },
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def _error(self, row, errors) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def _add(self, row, record) -> None:
+        if not isinstance(record, dict):
+            self._error(row, "Not a valid JSON object.")
+            return
+
+        record_type = record.get("type")
+        if record_type == "course":
+            self._add_course(row, record)
+        elif self.course is None:
+            self._error(row, "The course record must come first.")
+        elif record_type == "module":
+            self.pending_modules.append((row, record))
+            if len(self.pending_modules) >= self.chunk_size:
+                self._flush_modules()
+        elif record_type == "topic":
+            self.pending_topics.append((row, record))
+            if len(self.pending_topics) >= self.chunk_size:
+                self._flush()
+        else:
+            self._error(row, f"Unknown record type: {record_type!r}.")
+
+    def _add_course(self, row, record) -> None:
+        if self.course is not None:
+            self._error(row, "Only one course record is allowed.")
+            return
+        serializer = ImportCourseSerializer(data=record)
+        if not serializer.is_valid():
+            self._error(row, serializer.errors)
+            return
+        course = Course(author=self.author, **serializer.validated_data)
+        save_course_with_slug(course, course.title)
+        self.course = course
+
+    def _validate(self, validator, row, record):
+        try:
+            return validator.run_validation(record)
+        except serializers.ValidationError as exc:
+            self._error(row, exc.detail)
+            return None
+
+    def _flush(self) -> None:
+        # topics may point at modules that are still pending
+        self._flush_modules()
+        self._flush_topics()
+
+    def _flush_modules(self) -> None:
+        if not self.pending_modules:
+            return
+        new_modules = {}
+        for row, record in self.pending_modules:
+            data = self._validate(self._module_validator, row, record)
+            if data is None:
+                continue
+            source_id = data.pop("id")
+            if source_id in self.modules or source_id in new_modules:
+                self._error(row, {"id": [f"Duplicate module id {source_id}."]})
+                continue
+            new_modules[source_id] = Module(course=self.course, **data)
+        self.pending_modules = []
+
+        Module.objects.bulk_create(new_modules.values())
+        self.modules.update(new_modules)
+
+    def _flush_topics(self) -> None:
+        if not self.pending_topics:
+            return
+        by_module = {}
+        for row, record in self.pending_topics:
+            data = self._validate(self._topic_validator, row, record)
+            if data is None:
+                continue
+            module = self.modules.get(data.pop("module_id"))
+            if module is None:
+                self._error(row, {"module_id": ["Unknown module; module records must come before their topics."]})
+                continue
+            by_module.setdefault(module, []).append(data)
+        self.pending_topics = []
+
+        self.writer.create_many(TOPIC_LEVEL, by_module.items())
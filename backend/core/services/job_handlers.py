@@ -0,0 +1,82 @@
+"""
+Handlers of the background jobs queued by the teacher API.
+Imported by CoreConfig.ready() so web processes and workers share the registry.
+"""
+from django.core.files.storage import default_storage
+
+from ..models import Course, Module, Topic
+from ..serializers.teacher import TeacherCourseSerializer
+from .deletion import delete_module, delete_topic, purge_course, purge_modules, purge_topics
+from .importer import CourseImporter, read_records
+from .jobs import JobFailed, job_handler, payload_request_data
+
+
+@job_handler("course.update")
+def update_course(job):
+    course = Course.objects.filter(pk=job.payload["course_id"]).first()
+    if course is None:
+        raise JobFailed("Course not found.")
+    serializer = TeacherCourseSerializer(
+        course,
+        data=payload_request_data(job.payload),
+        partial=job.payload.get("partial", False),
+        context={"request": None},
+    )
+    if not serializer.is_valid():
+        raise JobFailed("Invalid course data.", {"errors": serializer.errors})
+    serializer.save()
+    return {"course_id": course.pk}
+
+
+@job_handler("course.import")
+def import_course(job):
+    path = job.payload["path"]
+    try:
+        importer = CourseImporter(job.owner, skip_invalid=job.payload.get("skip_invalid", False))
+        with default_storage.open(path, "rb") as stream:
+            summary = importer.run(read_records(stream, job.payload["format"]))
+    finally:
+        default_storage.delete(path)
+    if not importer.imported:
+        raise JobFailed("Nothing imported.", summary)
+    return summary
+
+
+# Deletes: the request soft-deleted the rows, these purge them
+# (all_objects, since the default managers hide soft-deleted rows).
+
+@job_handler("course.delete")
+def purge_course_job(job):
+    purge_course(job.payload["id"])
+    return {"id": job.payload["id"]}
+
+
+@job_handler("module.delete")
+def purge_module_job(job):
+    module = Module.all_objects.filter(pk=job.payload["id"]).first()
+    if module is not None:
+        delete_module(module)
+    return {"id": job.payload["id"]}
+
+
+@job_handler("topic.delete")
+def purge_topic_job(job):
+    topic = Topic.all_objects.filter(pk=job.payload["id"]).first()
+    if topic is not None:
+        delete_topic(topic)
+    return {"id": job.payload["id"]}
+
+
+# Rows TreeWriter soft-deleted while updating a course or module tree;
+# the write already marked the course changed.
+
+@job_handler("module.purge")
+def purge_modules_job(job):
+    purge_modules(job.payload["ids"])
+    return {"ids": job.payload["ids"]}
+
+
+@job_handler("topic.purge")
+def purge_topics_job(job):
+    purge_topics(job.payload["ids"])
+    return {"ids": job.payload["ids"]}
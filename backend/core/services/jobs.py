@@ -0,0 +1,142 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import QueryDict
+from django.utils import timezone
+
+from ..models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> callable(job) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+
+class JobFailed(Exception):
+    """
+    Raised by a handler for an expected failure: the job fails at once
+    (no retry) and `result` is kept for the client, e.g. validation errors.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def job_handler(kind: str):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def stale_after() -> timedelta:
+    return timedelta(seconds=getattr(settings, "JOB_STALE_AFTER_SECONDS", 60 * 30))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 60 * 30))
+
+
+def enqueue(kind: str, payload: dict | None = None, owner=None, max_attempts: int = 1) -> Job:
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"No handler registered for job kind {kind!r}.")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        owner=owner,
+        max_attempts=max_attempts,
+    )
+
+
+def request_data_payload(data) -> dict:
+    """
+    `request.data` in a form a job can store and hand back to a serializer:
+    a JSON body as is, a form (QueryDict) with every value of each key.
+    """
+    if isinstance(data, QueryDict):
+        return {"data": dict(data.lists()), "form": True}
+    return {"data": data}
+
+
+def payload_request_data(payload: dict):
+    """The request data stored by request_data_payload()."""
+    if not payload.get("form"):
+        return payload["data"]
+    data = QueryDict(mutable=True)
+    for key, values in payload["data"].items():
+        data.setlist(key, values)
+    return data
+
+
+def claim_next(worker_id: str) -> Job | None:
+    """
+    Lock the oldest due job and mark it running. SKIP LOCKED lets several
+    workers poll the same table (ignored on SQLite, which has one writer).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.locked_by = worker_id
+        job.save(update_fields=["status", "attempts", "started_at", "locked_by"])
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Jobs left running by a worker that died: requeued while they have
+    attempts left, failed otherwise.
+    """
+    cutoff = timezone.now() - stale_after()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        error="Worker stopped while running the job.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, locked_by="")
+    return failed + requeued
+
+
+def run_job(job: Job) -> Job:
+    handler = JOB_HANDLERS.get(job.kind)
+    now = timezone.now
+    try:
+        if handler is None:
+            raise JobFailed(f"No handler registered for job kind {job.kind!r}.")
+        job.result = handler(job)
+    except JobFailed as exc:
+        job.status = Job.Status.FAILED
+        job.error = str(exc)
+        job.result = exc.result
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        job.error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.QUEUED
+            job.run_after = now() + retry_delay(job.attempts)
+        else:
+            job.status = Job.Status.FAILED
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.error = ""
+
+    if job.status != Job.Status.QUEUED:
+        job.finished_at = now()
+    job.locked_by = ""
+    job.save(update_fields=["status", "result", "error", "run_after", "finished_at", "locked_by"])
+    return job
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Length
+
+from ..cache import course_tag, tagged_key
+from ..models import Course, Module, Topic
+
+# Same shape as ModuleSerializer / TopicSerializer output.
+OUTLINE_MODULE_FIELDS = ("id", "title", "order")
+OUTLINE_TOPIC_FIELDS = (
+    "id",
+    "title",
+    "order",
+    "is_timed_test",
+    "time_limit_seconds",
+    "question_count",
+    "content_length",
+)
+
+
+def outline_topics():
+    """
+    Topics without their body: `content` is never read, only its length
+    (computed by the database).
+    """
+    return Topic.objects.defer("content").annotate(content_length=Length("content"))
+
+
+def outline_cache_key(course: Course) -> str:
+    # content_version covers teacher API writes; the course tag covers
+    # admin edits and deletes caught by the model signals
+    return tagged_key(
+        "course-outline", course.pk, f"v{course.content_version}",
+        tags=[course_tag(course.pk)],
+    )
+
+
+def build_course_outline(course_id) -> list[dict]:
+    """
+    Modules with their topics as plain dicts, two queries.
+    """
+    modules = list(
+        Module.objects
+        .filter(course_id=course_id)
+        .order_by("order", "id")
+        .values(*OUTLINE_MODULE_FIELDS)
+    )
+    topics_by_module = {m["id"]: [] for m in modules}
+    topics = (
+        outline_topics()
+        .filter(module__course_id=course_id)
+        .order_by("order", "id")
+        .values("module_id", *OUTLINE_TOPIC_FIELDS)
+    )
+    for topic in topics:
+        module_id = topic.pop("module_id")
+        topics_by_module[module_id].append(topic)
+
+    for module in modules:
+        module["topics"] = topics_by_module[module["id"]]
+    return modules
+
+
+def get_course_outline(course: Course) -> list[dict]:
+    """
+    Cached outline for the course's current content version.
+    Callers must not mutate the returned structure.
+    """
+    key = outline_cache_key(course)
+    outline = cache.get(key)
+    if outline is None:
+        outline = build_course_outline(course.pk)
+        cache.set(
+            key,
+            outline,
+            getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 60 * 60 * 24),
+        )
+    return outline
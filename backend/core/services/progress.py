@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import User
+
+# what the learning views show of a progress row; the validators only
+# need to move when one of these changes
+VISIBLE_PROGRESS_FIELDS = ("status", "score", "correct_count")
+
+
+def visible_progress(progress) -> tuple:
+    return tuple(getattr(progress, field) for field in VISIBLE_PROGRESS_FIELDS)
+
+
+def mark_progress_changed(*user_ids) -> None:
+    """
+    Called after a visible change of a user's topic progress or of their
+    enrollments. Moves User.progress_updated_at, which is the per-user part
+    of the learning ETags and of Last-Modified.
+
+    The UPDATE runs once the surrounding transaction has committed, so the
+    user row is not locked for the rest of an answer write.
+    """
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+    transaction.on_commit(
+        lambda: User.objects.filter(pk__in=user_ids).update(progress_updated_at=timezone.now())
+    )
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Exists, FloatField, OuterRef, Q, Value, When
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from ..models import Module, Topic
+
+# Weighted document: course title (A), module and topic titles (B),
+# description (C). Kept in sync with migration 0011.
+SEARCH_DOCUMENT_SQL = """
+UPDATE core_course AS c SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(c.title, '')), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+        SELECT string_agg(s.title, ' ')
+        FROM (
+            SELECT m.title FROM core_module AS m
+            WHERE m.course_id = c.id AND m.deleted_at IS NULL
+            UNION ALL
+            SELECT t.title FROM core_topic AS t
+            JOIN core_module AS tm ON tm.id = t.module_id
+            WHERE tm.course_id = c.id AND t.deleted_at IS NULL
+        ) AS s
+    ), '')), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(c.description, '')), 'C')
+WHERE c.id = %(course_id)s
+"""
+
+
+def search_config() -> str:
+    return getattr(settings, "COURSE_SEARCH_CONFIG", "simple")
+
+
+def uses_postgres_search() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def refresh_course_search_document(course_id) -> None:
+    """
+    Rebuild Course.search_vector in one UPDATE. No-op outside PostgreSQL,
+    where the local fallback searches the tables directly.
+    """
+    if not uses_postgres_search():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_DOCUMENT_SQL,
+            {"config": search_config(), "course_id": course_id},
+        )
+
+
+def _postgres_search(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    text = " ".join(terms)
+    query = SearchQuery(text, config=search_config(), search_type="websearch")
+    return (
+        queryset
+        .annotate(
+            search_rank=SearchRank("search_vector", query),
+            title_similarity=TrigramSimilarity("title", text),
+        )
+        # `%` (trigram_similar) uses the gin_trgm_ops index and catches typos
+        .filter(Q(search_vector=query) | Q(title__trigram_similar=text))
+    ), ("-search_rank", "-title_similarity", "id")
+
+
+def _local_search(queryset, terms):
+    """
+    Portable fallback (SQLite in tests): every term must appear in the
+    course title, description, or one of its module / topic titles.
+    """
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term)
+            | Q(description__icontains=term)
+            | Exists(Module.objects.filter(course=OuterRef("pk"), title__icontains=term))
+            | Exists(Topic.objects.filter(module__course=OuterRef("pk"), title__icontains=term))
+        )
+    return queryset.annotate(
+        search_rank=Case(
+            When(title__icontains=terms[0], then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    ), ("-search_rank", "id")
+
+
+class CourseSearchFilter(SearchFilter):
+    """
+    Ranked course search on the standard `?search=` parameter.
+    PostgreSQL: tsvector match + trigram fallback for typos.
+    Other databases: icontains over the same fields.
+    Results are ordered by rank unless the client passes `?ordering=`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if uses_postgres_search():
+            queryset, rank_ordering = _postgres_search(queryset, terms)
+        else:
+            queryset, rank_ordering = _local_search(queryset, terms)
+
+        if api_settings.ORDERING_PARAM not in request.query_params:
+            queryset = queryset.order_by(*rank_ordering)
+        return queryset
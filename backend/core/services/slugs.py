@@ -0,0 +1,74 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from ..models import Course
+
+# room for "-<counter>" inside the SlugField max_length
+SUFFIX_RESERVE = 8
+MAX_ATTEMPTS = 5
+
+
+def _slug_pattern(base: str):
+    return re.compile(rf"{re.escape(base)}(?:-(\d+))?")
+
+
+def base_course_slug(title: str) -> str:
+    max_length = Course._meta.get_field("slug").max_length
+    return slugify(title or "")[:max_length - SUFFIX_RESERVE].strip("-") or "course"
+
+
+def next_free_course_slug(title: str, course: Course | None = None) -> str:
+    """
+    One prefix query: take every slug starting with the base and use the
+    next suffix after the highest one. A course keeps its slug when it
+    already belongs to the same base.
+
+    `<base>-<n>` only counts as a numbered copy when that course's own
+    title gives the same base: "python-3" of a course titled "Python 3"
+    is not the third copy of "python".
+    """
+    base = base_course_slug(title)
+    pattern = _slug_pattern(base)
+    if course is not None and course.slug and pattern.fullmatch(course.slug):
+        return course.slug
+
+    taken = Course.objects.filter(slug__startswith=base)
+    if course is not None and course.pk:
+        taken = taken.exclude(pk=course.pk)
+
+    taken_slugs = set()
+    suffixes = []
+    for slug, other_title in taken.values_list("slug", "title"):
+        taken_slugs.add(slug)
+        match = pattern.fullmatch(slug)
+        if match and match.group(1) and base_course_slug(other_title) == base:
+            suffixes.append(int(match.group(1)))
+    if base not in taken_slugs:
+        return base
+    suffix = max(suffixes, default=0) + 1
+    # skip numbered slugs that belong to another base ("Python 3")
+    while f"{base}-{suffix}" in taken_slugs:
+        suffix += 1
+    return f"{base}-{suffix}"
+
+
+def save_course_with_slug(course: Course, title: str) -> Course:
+    """
+    Save with a freshly allocated slug. Two concurrent saves may pick the
+    same suffix; the loser hits the unique constraint inside its savepoint
+    and retries with the next one.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        course.slug = next_free_course_slug(title, course)
+        try:
+            with transaction.atomic():
+                course.save()
+            return course
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            # the slug we kept may be the one that clashed
+            course.slug = ""
+    return course
@@ -0,0 +1,183 @@
+from collections import defaultdict
+
+from ..models import Course, Module, Topic, TopicQuestion, TopicQuestionOption
+from .deletion import delete_rows
+
+
+class TreeLevel:
+    """
+    One level of the course tree: which model, how it points to its parent,
+    which payload keys map to columns and where its children are.
+    """
+
+    def __init__(self, model, parent_field: str, fields: tuple, children_key: str | None = None, child=None):
+        self.model = model
+        self.parent_field = parent_field
+        self.fields = fields
+        self.children_key = children_key
+        self.child = child
+
+    @property
+    def parent_id_field(self) -> str:
+        return f"{self.parent_field}_id"
+
+
+OPTION_LEVEL = TreeLevel(
+    TopicQuestionOption, "question", ("text", "is_correct"),
+)
+QUESTION_LEVEL = TreeLevel(
+    TopicQuestion, "topic", ("text", "order", "question_type", "max_score"),
+    "options", OPTION_LEVEL,
+)
+TOPIC_LEVEL = TreeLevel(
+    Topic, "module", ("title", "content", "order", "is_timed_test", "time_limit_seconds"),
+    "questions", QUESTION_LEVEL,
+)
+MODULE_LEVEL = TreeLevel(
+    Module, "course", ("title", "order"),
+    "topics", TOPIC_LEVEL,
+)
+
+
+class TreeWriter:
+    """
+    Applies a nested payload (modules -> topics -> questions -> options)
+    level by level: one SELECT of the existing rows, one bulk INSERT, one
+    bulk UPDATE and one (chunked, see services.deletion) DELETE per level,
+    whatever the number of nodes.
+
+    Items with an `id` that belongs to the same parent are updated (only
+    the keys present in the item), items without a known id are created,
+    existing children missing from the payload are deleted. A missing
+    children key leaves that subtree untouched.
+
+    `existing_depth` limits how deep the children of *existing* rows are
+    synced (new rows always get their whole subtree). The course editor
+    owns modules and topics, while questions of an existing topic are
+    owned by the topic editor, so course updates pass 2.
+
+    Must run inside a transaction.
+    """
+
+    def __init__(self):
+        self.created = defaultdict(list)
+        self.updated = defaultdict(list)
+        self.deleted_ids = defaultdict(list)
+
+    def write(self, level: TreeLevel, parent, items, existing_depth: int | None = None, parent_is_new: bool = False):
+        """
+        Sync the children of `parent` (rows of `level`) with `items`.
+        """
+        if items is None:
+            return self
+        self._sync_level(level, [(parent, items, parent_is_new)], existing_depth)
+        return self
+
+    def create_many(self, level: TreeLevel, batches):
+        """
+        Insert the subtrees of new children for several parents at once,
+        `batches` being (parent, items) pairs: one bulk INSERT per level for
+        all of them, no lookup of existing rows.
+        """
+        self._sync_level(level, [(parent, items, True) for parent, items in batches], None)
+        return self
+
+    def update_node(self, level: TreeLevel, obj, item, existing_depth: int | None = None):
+        """
+        Update one existing row of `level` from `item` (saved only if a
+        field changed), then sync its children if the item carries them.
+        """
+        if self._apply(level, obj, item):
+            obj.save(update_fields=list(level.fields))
+        if level.child is not None:
+            self.write(level.child, obj, item.get(level.children_key), existing_depth)
+        return self
+
+    def _sync_level(self, level: TreeLevel, batches, existing_depth):
+        batches = [b for b in batches if b[1] is not None]
+        if not batches:
+            return
+
+        existing = self._load_existing(level, batches)
+
+        to_create = []
+        to_update = []
+        to_delete = []
+        next_batches = []
+        descend_existing = existing_depth is None or existing_depth > 1
+        child_depth = None if existing_depth is None else existing_depth - 1
+
+        for parent, items, parent_is_new in batches:
+            current = existing.get(parent.pk, {})
+            seen = set()
+            for item in items:
+                obj = current.get(item.get("id"))
+                if obj is not None:
+                    seen.add(obj.pk)
+                    if self._apply(level, obj, item):
+                        to_update.append(obj)
+                    children = item.get(level.children_key) if descend_existing else None
+                    next_batches.append((obj, children, False))
+                else:
+                    obj = level.model(**{level.parent_field: parent})
+                    self._apply(level, obj, item)
+                    to_create.append(obj)
+                    next_batches.append((obj, item.get(level.children_key) or [], True))
+            to_delete.extend(pk for pk in current if pk not in seen)
+
+        if to_create:
+            level.model.objects.bulk_create(to_create)
+        if to_update:
+            level.model.objects.bulk_update(to_update, level.fields)
+        if to_delete:
+            delete_rows(level.model, to_delete)
+
+        self.created[level.model].extend(to_create)
+        self.updated[level.model].extend(to_update)
+        self.deleted_ids[level.model].extend(to_delete)
+
+        if level.child is not None:
+            # new parents may come back without ids on backends that cannot
+            # return them from bulk_create; fail loudly rather than orphan rows
+            for obj, _children, _is_new in next_batches:
+                if obj.pk is None:
+                    raise RuntimeError(
+                        f"bulk_create did not return primary keys for {level.model.__name__}"
+                    )
+            self._sync_level(level.child, next_batches, child_depth)
+
+    def _load_existing(self, level: TreeLevel, batches):
+        parent_ids = [parent.pk for parent, _items, is_new in batches if not is_new]
+        existing = defaultdict(dict)
+        if not parent_ids:
+            return existing
+        rows = level.model.objects.filter(**{f"{level.parent_id_field}__in": parent_ids})
+        for obj in rows:
+            existing[getattr(obj, level.parent_id_field)][obj.pk] = obj
+        return existing
+
+    @staticmethod
+    def _apply(level: TreeLevel, obj, item) -> bool:
+        changed = False
+        for field in level.fields:
+            if field in item and getattr(obj, field) != item[field]:
+                setattr(obj, field, item[field])
+                changed = True
+        return changed
+
+
+TREE_PREFETCH = {
+    Course: "modules__topics__questions__options",
+    Module: "topics__questions__options",
+    Topic: "questions__options",
+    TopicQuestion: "options",
+}
+
+
+def reload_tree(instance):
+    """
+    Single post-save reload of a node with its whole subtree prefetched,
+    so serializing the response does not query per child.
+    """
+    model = type(instance)
+    return model.objects.prefetch_related(TREE_PREFETCH[model]).get(pk=instance.pk)
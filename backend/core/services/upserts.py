@@ -0,0 +1,238 @@
+"""
+Single-statement upserts for the practice writes.
+
+On PostgreSQL the progress row and the answer are written with
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING: one round trip (plus a
+locking read of an unchanged progress row), and a concurrent double click
+updates the row instead of failing on the unique constraint. Other backends read the previous answer first and write it
+with bulk_create(update_conflicts=True), or get_or_create() where that
+is not supported.
+"""
+import json
+
+from django.db import connection
+from django.utils import timezone
+
+from ..models import TopicProgress, TopicQuestionAnswer
+
+PROGRESS_COLUMNS = (
+    "id",
+    "user_id",
+    "topic_id",
+    "status",
+    "is_timed",
+    "time_limit_seconds",
+    "score",
+    "started_at",
+    "completed_at",
+    "timed_out",
+    "answered_count",
+    "correct_count",
+)
+
+# The DO UPDATE only runs when something actually changes, so opening a
+# topic again writes nothing and returns no row; LOCK_PROGRESS_SQL then
+# reads it. That has to be a statement of its own: under READ COMMITTED
+# a fallback SELECT in this statement would read its snapshot, i.e. the
+# counters from before a concurrent answer this statement waited for.
+ENSURE_PROGRESS_SQL = """
+INSERT INTO core_topicprogress AS p (
+    user_id, topic_id, status, is_timed, time_limit_seconds, score,
+    started_at, completed_at, timed_out, answered_count, correct_count
+)
+VALUES (
+    %(user_id)s, %(topic_id)s, %(in_progress)s, %(is_timed)s, %(time_limit_seconds)s, NULL,
+    %(started_at)s, NULL, false, 0, 0
+)
+ON CONFLICT (user_id, topic_id) DO UPDATE SET
+    status = CASE WHEN p.status = %(not_started)s THEN %(in_progress)s ELSE p.status END,
+    is_timed = EXCLUDED.is_timed,
+    time_limit_seconds = CASE
+        WHEN EXCLUDED.is_timed THEN %(effective_limit)s ELSE p.time_limit_seconds
+    END,
+    started_at = CASE
+        WHEN EXCLUDED.is_timed THEN COALESCE(p.started_at, EXCLUDED.started_at) ELSE p.started_at
+    END
+WHERE p.status = %(not_started)s
+    OR p.is_timed <> EXCLUDED.is_timed
+    OR (EXCLUDED.is_timed AND (
+        p.time_limit_seconds IS DISTINCT FROM %(effective_limit)s OR p.started_at IS NULL
+    ))
+RETURNING {columns}
+""".format(columns=", ".join(PROGRESS_COLUMNS))
+
+# A new statement sees every committed write; FOR UPDATE waits for the
+# ones still in flight and serializes concurrent answers of one user on
+# one topic.
+LOCK_PROGRESS_SQL = """
+SELECT {columns} FROM core_topicprogress
+WHERE user_id = %(user_id)s AND topic_id = %(topic_id)s
+FOR UPDATE
+""".format(columns=", ".join(PROGRESS_COLUMNS))
+
+# `old` reads the row as it was before this statement: the previous
+# correctness for the counters. xmax = 0 only on a freshly inserted row.
+ANSWER_SQL = """
+WITH old AS (
+    SELECT is_correct FROM core_topicquestionanswer
+    WHERE user_id = %(user_id)s AND question_id = %(question_id)s
+)
+INSERT INTO core_topicquestionanswer AS a (
+    user_id, question_id, topic_id, selected_option_ids, is_correct, score, answered_at
+)
+VALUES (
+    %(user_id)s, %(question_id)s, %(topic_id)s, %(selected_option_ids)s::jsonb,
+    %(is_correct)s, %(score)s, %(answered_at)s
+)
+ON CONFLICT (user_id, question_id) DO UPDATE SET
+    topic_id = EXCLUDED.topic_id,
+    selected_option_ids = EXCLUDED.selected_option_ids,
+    is_correct = EXCLUDED.is_correct,
+    score = EXCLUDED.score,
+    answered_at = EXCLUDED.answered_at
+RETURNING a.xmax = 0, COALESCE((SELECT is_correct FROM old), false)
+"""
+
+
+def uses_postgres_upserts() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def upsert_row(model, lookup: dict, values: dict):
+    """
+    update_or_create() in one INSERT ... ON CONFLICT DO UPDATE statement.
+    `lookup` must name the fields of a unique constraint. No save() and
+    no signals, as with bulk_create().
+    """
+    if not connection.features.supports_update_conflicts_with_target:
+        obj, _ = model.objects.update_or_create(defaults=values, **lookup)
+        return obj
+    obj = model(**lookup, **values)
+    model.objects.bulk_create(
+        [obj],
+        update_conflicts=True,
+        unique_fields=list(lookup),
+        update_fields=list(values),
+    )
+    return obj
+
+
+def upsert_topic_progress(user, topic, is_timed: bool, time_limit_seconds: int | None):
+    """
+    The user's progress row on `topic`, created or brought in line with the
+    topic's timing (see ensure_topic_progress). Returns (progress, changed).
+    """
+    if not uses_postgres_upserts():
+        return _ensure_topic_progress_orm(user, topic, is_timed, time_limit_seconds)
+
+    now = timezone.now()
+    params = {
+        "user_id": user.pk,
+        "topic_id": topic.pk,
+        "not_started": TopicProgress.Status.NOT_STARTED,
+        "in_progress": TopicProgress.Status.IN_PROGRESS,
+        "is_timed": is_timed,
+        "time_limit_seconds": time_limit_seconds if is_timed else None,
+        "effective_limit": time_limit_seconds or 120,
+        "started_at": now if is_timed else None,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(ENSURE_PROGRESS_SQL, params)
+        row = cursor.fetchone()
+        changed = row is not None
+        if not changed:
+            cursor.execute(LOCK_PROGRESS_SQL, params)
+            row = cursor.fetchone()
+    progress = TopicProgress.from_db(connection.alias, PROGRESS_COLUMNS, row)
+    return progress, changed
+
+
+def _ensure_topic_progress_orm(user, topic, is_timed, time_limit_seconds):
+    progress, created = TopicProgress.objects.get_or_create(
+        user=user,
+        topic=topic,
+        defaults={
+            "status": TopicProgress.Status.IN_PROGRESS,
+            "is_timed": is_timed,
+            "time_limit_seconds": time_limit_seconds if is_timed else None,
+            "started_at": timezone.now() if is_timed else None,
+        },
+    )
+
+    updates = []
+    if progress.status == TopicProgress.Status.NOT_STARTED:
+        progress.status = TopicProgress.Status.IN_PROGRESS
+        updates.append("status")
+
+    if progress.is_timed != is_timed:
+        progress.is_timed = is_timed
+        updates.append("is_timed")
+
+    if is_timed:
+        effective_limit = time_limit_seconds or 120
+        if progress.time_limit_seconds != effective_limit:
+            progress.time_limit_seconds = effective_limit
+            updates.append("time_limit_seconds")
+        if not progress.started_at:
+            progress.started_at = timezone.now()
+            updates.append("started_at")
+
+    if updates:
+        progress.save(update_fields=updates)
+    return progress, bool(created or updates)
+
+
+def upsert_answer(user, question, option_ids, is_correct: bool, score: int):
+    """
+    Record the user's answer to `question`, replacing an earlier one.
+    Returns (created, was_correct) for the progress counters.
+    """
+    selected_option_ids = sorted(set(option_ids))
+    now = timezone.now()
+    if uses_postgres_upserts():
+        with connection.cursor() as cursor:
+            cursor.execute(ANSWER_SQL, {
+                "user_id": user.pk,
+                "question_id": question.pk,
+                "topic_id": question.topic_id,
+                "selected_option_ids": json.dumps(selected_option_ids),
+                "is_correct": is_correct,
+                "score": score,
+                "answered_at": now,
+            })
+            created, was_correct = cursor.fetchone()
+        return created, was_correct
+
+    if not connection.features.supports_update_conflicts_with_target:
+        answer, created = TopicQuestionAnswer.objects.get_or_create(
+            user=user,
+            question=question,
+            defaults={"topic_id": question.topic_id},
+        )
+        was_correct = answer.is_correct
+        answer.is_correct = is_correct
+        answer.score = score
+        answer.answered_at = now
+        answer.selected_option_ids = selected_option_ids
+        answer.save()
+        return created, was_correct
+
+    # The previous correctness is read first; the write itself is one
+    # INSERT ... ON CONFLICT DO UPDATE, as in upsert_row().
+    previous = (
+        TopicQuestionAnswer.objects.filter(user=user, question=question)
+        .values_list("is_correct", flat=True)
+        .first()
+    )
+    upsert_row(
+        TopicQuestionAnswer,
+        {"user": user, "question": question},
+        {
+            "topic_id": question.topic_id,
+            "selected_option_ids": selected_option_ids,
+            "is_correct": is_correct,
+            "score": score,
+            "answered_at": now,
+        },
+    )
+    return previous is None, bool(previous)
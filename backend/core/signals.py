@@ -0,0 +1,88 @@
+"""
+Cache invalidation for writes that do not go through the teacher API
+(admin, shell, cascades). Teacher API writes bump Course.content_version
+themselves. Saves of courses, modules and topics outside it also rebuild
+the course search document.
+
+Questions and options have no receivers: they only feed the grading
+cache, keyed by the course content version, and every path that writes
+them (TreeWriter callers, the importer, the admin) bumps that version
+once per write. Receivers would also stop Django from fast-deleting them.
+Subtree purges (services.deletion) use raw deletes and send no signals.
+"""
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import catalog_tag, course_tag, invalidate_tags
+from .models import Course, Module, Topic, User
+from .services.access import (
+    enrolled_courses_key,
+    invalidate_enrolled_courses,
+    invalidate_topic_course,
+)
+from .services.progress import mark_progress_changed
+from .services.search import refresh_course_search_document
+
+
+# fields of a user that the course list shows (author_name)
+AUTHOR_NAME_FIELDS = {"first_name", "last_name", "username"}
+
+# fields of a course in its search document
+SEARCH_FIELDS = {"title", "description"}
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    invalidate_tags(course_tag(instance.pk), catalog_tag())
+    update_fields = kwargs.get("update_fields")
+    if kwargs["signal"] is post_save and (update_fields is None or SEARCH_FIELDS & set(update_fields)):
+        refresh_course_search_document(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # last_login and the like are saved with update_fields: no course list change
+    if created or (update_fields is not None and not AUTHOR_NAME_FIELDS & set(update_fields)):
+        return
+    invalidate_tags(catalog_tag())
+
+
+@receiver([post_save, post_delete], sender=Module)
+def module_changed(sender, instance, **kwargs):
+    invalidate_tags(course_tag(instance.course_id))
+    refresh_course_search_document(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def topic_changed(sender, instance, **kwargs):
+    invalidate_topic_course(instance.pk)
+    course_id = (
+        Module.all_objects.filter(pk=instance.module_id)
+        .values_list("course_id", flat=True)
+        .first()
+    )
+    if course_id is not None:
+        invalidate_tags(course_tag(course_id))
+        refresh_course_search_document(course_id)
+
+
+@receiver(m2m_changed, sender=User.enrolled_courses.through)
+def enrollments_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        # user.enrolled_courses.add/remove/clear
+        if action != "pre_clear":
+            invalidate_enrolled_courses(instance)
+            mark_progress_changed(instance.pk)
+        return
+    # course.students.add/remove/clear: instance is the course
+    if action == "pre_clear":
+        user_ids = list(instance.students.values_list("pk", flat=True))
+    elif action == "post_clear":
+        return
+    else:
+        user_ids = pk_set or ()
+    cache.delete_many([enrolled_courses_key(user_id) for user_id in user_ids])
+    mark_progress_changed(*user_ids)
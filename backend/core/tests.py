@@ -1,3 +1,953 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import (
+    Course,
+    Job,
+    Module,
+    Topic,
+    TopicProgress,
+    TopicQuestion,
+    TopicQuestionAnswer,
+    TopicQuestionAnswerArchive,
+    TopicQuestionOption,
+    User,
+)
+from .services.archive import archive_finished_attempts
+from .services.counters import refresh_topic_counters
+from .services.deletion import purge_course, purge_modules, purge_topics, soft_delete_modules, soft_delete_topics
+from .services.importer import CourseImporter, read_records
+from .services.jobs import claim_next, run_job
+from .services.slugs import next_free_course_slug, save_course_with_slug
+from .services.upserts import upsert_answer, upsert_topic_progress
+from .views.learning.state import load_practice_history, load_practice_state
+
+
+def make_course(author, title="Python basics", modules=1, topics=1, questions=2):
+    """
+    Course with `modules` x `topics` x `questions`, two options per
+    question (the first one correct).
+    """
+    course = Course.objects.create(author=author, title=title, slug=title.lower().replace(" ", "-"))
+    for m in range(modules):
+        module = Module.objects.create(course=course, title=f"Module {m}", order=m)
+        for t in range(topics):
+            topic = Topic.objects.create(
+                module=module, title=f"Topic {m}.{t}", content="Theory", order=t,
+                question_count=questions,
+            )
+            for q in range(questions):
+                question = TopicQuestion.objects.create(topic=topic, text=f"Q{q}", order=q)
+                TopicQuestionOption.objects.create(question=question, text="yes", is_correct=True)
+                TopicQuestionOption.objects.create(question=question, text="no", is_correct=False)
+    return course
+
+
+class LearningTestCase(TestCase):
+    def setUp(self):
+        # locmem outlives the per-test transaction
+        cache.clear()
+        self.teacher = User.objects.create_user("teacher", password="pw", role=User.Roles.TEACHER)
+        self.student = User.objects.create_user("student", password="pw")
+        self.course = make_course(self.teacher)
+        self.student.enrolled_courses.add(self.course)
+        self.module = self.course.modules.get()
+        self.topic = self.module.topics.get()
+        self.questions = list(self.topic.questions.order_by("order"))
+
+        self.teacher_client = APIClient()
+        self.teacher_client.force_authenticate(self.teacher)
+        self.student_client = APIClient()
+        self.student_client.force_authenticate(self.student)
+
+    def answer(self, question, correct=True):
+        option = question.options.get(is_correct=correct)
+        return self.student_client.post(
+            f"/api/learning/questions/{question.pk}/answer/",
+            {"selected_options": [option.pk]},
+            format="json",
+        )
+
+    def course_payload(self):
+        return {
+            "title": self.course.title,
+            "description": "Updated",
+            "modules": [
+                {
+                    "id": module.pk,
+                    "title": module.title,
+                    "order": module.order,
+                    "topics": [
+                        {"id": topic.pk, "title": topic.title, "order": topic.order}
+                        for topic in module.topics.order_by("order")
+                    ],
+                }
+                for module in self.course.modules.order_by("order")
+            ],
+        }
+
+
+class TeacherCourseUpdateTests(LearningTestCase):
+    def test_json_put_keeps_modules_topics_and_answers(self):
+        self.answer(self.questions[0])
+        topic_ids = list(Topic.objects.values_list("pk", flat=True))
+
+        response = self.teacher_client.put(
+            f"/api/teacher/courses/{self.course.pk}/",
+            self.course_payload(),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.course.modules.values_list("pk", flat=True)), [self.module.pk])
+        self.assertEqual(list(Topic.objects.values_list("pk", flat=True)), topic_ids)
+        self.assertEqual(TopicQuestionAnswer.objects.filter(user=self.student).count(), 1)
+        self.assertTrue(TopicProgress.objects.filter(user=self.student, topic=self.topic).exists())
+
+    def test_async_update_keeps_progress_and_answers(self):
+        for question in self.questions:
+            self.answer(question)
+        topic_ids = list(Topic.objects.values_list("pk", flat=True))
+
+        response = self.teacher_client.put(
+            f"/api/teacher/courses/{self.course.pk}/?async=1",
+            self.course_payload(),
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+        job = run_job(claim_next("test-worker"))
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).description, "Updated")
+        self.assertEqual(list(self.course.modules.values_list("pk", flat=True)), [self.module.pk])
+        self.assertEqual(list(Topic.objects.values_list("pk", flat=True)), topic_ids)
+        self.assertEqual(TopicQuestionAnswer.objects.filter(user=self.student).count(), 2)
+        progress = TopicProgress.objects.get(user=self.student, topic=self.topic)
+        self.assertEqual(progress.correct_count, 2)
+
+
+    def form_payload(self, title):
+        return {
+            "title": self.course.title,
+            "description": "Updated",
+            "modules[0]id": self.module.pk,
+            "modules[0]title": title,
+            "modules[0]order": 0,
+            "modules[0]topics[0]id": self.topic.pk,
+            "modules[0]topics[0]title": self.topic.title,
+        }
+
+    def test_async_form_update_matches_the_sync_one(self):
+        url = f"/api/teacher/courses/{self.course.pk}/"
+        response = self.teacher_client.put(url, self.form_payload("Sync"), format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Module.objects.get(pk=self.module.pk).title, "Sync")
+
+        response = self.teacher_client.put(f"{url}?async=1", self.form_payload("Async"), format="multipart")
+        self.assertEqual(response.status_code, 202)
+        job = run_job(claim_next("test-worker"))
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual(Module.objects.get(pk=self.module.pk).title, "Async")
+        self.assertEqual(list(Topic.objects.values_list("pk", flat=True)), [self.topic.pk])
+
+
+class DeletionTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = make_course(self.teacher, title="Big", modules=2, topics=2)
+        self.student.enrolled_courses.add(self.course)
+        self.modules = list(self.course.modules.order_by("order"))
+        topics = list(Topic.objects.filter(module__course=self.course).order_by("module__order", "order"))
+        # three finished attempts go to the archive, the last one stays live
+        for topic in topics[:-1]:
+            for question in topic.questions.all():
+                self.answer(question)
+        self.answer(topics[-1].questions.first())
+        archive_finished_attempts(timezone.now() + timedelta(seconds=1))
+        self.assertEqual(TopicQuestionAnswerArchive.objects.count(), 6)
+
+    def subtree_counts(self):
+        course = self.course.pk
+        return {
+            "modules": Module.all_objects.filter(course=course).count(),
+            "topics": Topic.all_objects.filter(module__course=course).count(),
+            "questions": TopicQuestion.objects.filter(topic__module__course=course).count(),
+            "options": TopicQuestionOption.objects.filter(question__topic__module__course=course).count(),
+            "progress": TopicProgress.objects.filter(topic__module__course=course).count(),
+            "answers": (
+                TopicQuestionAnswer.objects.filter(topic__module__course=course).count()
+                + TopicQuestionAnswerArchive.objects.filter(topic__module__course=course).count()
+            ),
+        }
+
+    def test_soft_deleted_rows_leave_the_live_querysets(self):
+        module, other = self.modules
+        topic = other.topics.order_by("order").first()
+        soft_delete_modules([module.pk])
+        soft_delete_topics([topic.pk])
+
+        self.assertEqual(list(self.course.modules.all()), [other])
+        self.assertFalse(Topic.objects.filter(module=module).exists())
+        self.assertEqual(list(other.topics.all()), list(other.topics.exclude(pk=topic.pk)))
+        self.assertEqual(Topic.objects.filter(module__course=self.course).count(), 1)
+        # still there for the purge
+        self.assertEqual(Module.all_objects.filter(course=self.course).count(), 2)
+        self.assertEqual(Topic.all_objects.filter(module__course=self.course).count(), 4)
+        response = self.student_client.get(f"/api/learning/topics/{topic.pk}/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_purges_remove_whole_subtrees(self):
+        before = self.subtree_counts()
+        self.assertEqual(before, {
+            "modules": 2, "topics": 4, "questions": 8, "options": 16, "progress": 4, "answers": 7,
+        })
+        module, other = self.modules
+        soft_delete_modules([module.pk])
+        purge_modules([module.pk], chunk_size=3)
+        purge_topics([other.topics.order_by("order").first().pk], chunk_size=3)
+        self.assertEqual(self.subtree_counts(), {
+            "modules": 1, "topics": 1, "questions": 2, "options": 4, "progress": 1, "answers": 1,
+        })
+
+        purge_course(self.course.pk, chunk_size=3)
+        self.assertEqual(set(self.subtree_counts().values()), {0})
+        self.assertFalse(Course.objects.filter(pk=self.course.pk).exists())
+
+    def test_tree_writes_hide_removed_rows_and_purge_them_later(self):
+        module, other = self.modules
+        payload = {
+            "title": self.course.title,
+            "modules": [{"id": other.pk, "title": other.title, "order": other.order, "topics": [
+                {"id": topic.pk, "title": topic.title, "order": topic.order}
+                for topic in other.topics.order_by("order")[:1]
+            ]}],
+        }
+        response = self.teacher_client.put(f"/api/teacher/courses/{self.course.pk}/", payload, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        # hidden at once, rows and answers still in place
+        self.assertEqual(list(self.course.modules.all()), [other])
+        self.assertEqual(other.topics.count(), 1)
+        self.assertEqual(self.subtree_counts()["answers"], 7)
+
+        jobs = Job.objects.filter(kind__in=["module.purge", "topic.purge"])
+        self.assertEqual(jobs.count(), 2)
+        for _ in range(2):
+            job = run_job(claim_next("test-worker"))
+            self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual(self.subtree_counts(), {
+            "modules": 1, "topics": 1, "questions": 2, "options": 4, "progress": 1, "answers": 2,
+        })
+
+
+class QueryCountTests(LearningTestCase):
+    """
+    Read endpoints run a fixed number of queries, whatever the course size.
+    """
+
+    def setUp(self):
+        super().setUp()
+        make_course(self.teacher, title="Second course", modules=2, topics=3)
+        make_course(self.teacher, title="Third course", modules=3, topics=2)
+
+    def test_course_detail(self):
+        url = f"/api/courses/{self.course.pk}/"
+        # course + outline (modules, topics) on a cold cache
+        with self.assertNumQueries(3):
+            self.student_client.get(url)
+        # the course row only, the outline comes from the cache
+        with self.assertNumQueries(1):
+            response = self.student_client.get(url)
+        self.assertEqual(len(response.data["modules"]), 1)
+
+    def test_teacher_course_list(self):
+        # count, courses, modules, topics
+        with self.assertNumQueries(4):
+            response = self.teacher_client.get("/api/teacher/courses/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_teacher_topic_retrieve(self):
+        # topic, questions, options
+        with self.assertNumQueries(3):
+            response = self.teacher_client.get(f"/api/teacher/topics/{self.topic.pk}/")
+        self.assertEqual(len(response.data["questions"]), 2)
+
+
+
+def write_statements(queries) -> list[str]:
+    return [q["sql"] for q in queries if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+
+
+class ProgressValidatorTests(LearningTestCase):
+    def test_answers_bump_the_user_validator_only_on_visible_changes(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.answer(self.questions[0], correct=False)
+        # first answer: the progress row appears with a score
+        self.assertTrue(callbacks)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.answer(self.questions[0], correct=False)
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.answer(self.questions[0], correct=True)
+        self.assertEqual(len(callbacks), 1)
+        self.student.refresh_from_db()
+        self.assertIsNotNone(self.student.progress_updated_at)
+
+    def test_each_answer_is_one_answer_write(self):
+        for correct in (False, True):
+            with CaptureQueriesContext(connection) as queries:
+                self.answer(self.questions[0], correct=correct)
+            answer_writes = [
+                sql for sql in write_statements(queries.captured_queries) if "core_topicquestionanswer" in sql
+            ]
+            self.assertEqual(len(answer_writes), 1)
+        self.assertTrue(TopicQuestionAnswer.objects.get(user=self.student).is_correct)
+        progress = TopicProgress.objects.get(user=self.student, topic=self.topic)
+        self.assertEqual((progress.answered_count, progress.correct_count), (1, 1))
+
+    def test_polling_a_completed_topic_writes_nothing(self):
+        for question in self.questions:
+            self.answer(question)
+        url = f"/api/learning/topics/{self.topic.pk}/next-question/"
+        self.assertTrue(self.student_client.get(url).data["completed"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.student_client.get(url)
+        self.assertTrue(response.data["completed"])
+        self.assertEqual(write_statements(queries.captured_queries), [])
+
+
+class ReconcileCountersTests(LearningTestCase):
+    def test_recomputes_corrupted_counters(self):
+        self.answer(self.questions[0], correct=True)
+        self.answer(self.questions[1], correct=False)
+        other_topic = make_course(self.teacher, title="Other course").modules.get().topics.get()
+        Topic.objects.update(question_count=7)
+        TopicProgress.objects.update(answered_count=9, correct_count=9)
+
+        out = io.StringIO()
+        call_command("reconcile_counters", course=self.course.pk, batch_size=1, stdout=out)
+
+        self.assertIn("Reconciled 1 topics and 1 progress rows.", out.getvalue())
+        self.assertEqual(Topic.objects.get(pk=self.topic.pk).question_count, 2)
+        progress = TopicProgress.objects.get(user=self.student, topic=self.topic)
+        self.assertEqual((progress.answered_count, progress.correct_count), (2, 1))
+        # --course leaves other courses alone
+        self.assertEqual(Topic.objects.get(pk=other_topic.pk).question_count, 7)
+
+        call_command("reconcile_counters", stdout=io.StringIO())
+        self.assertEqual(Topic.objects.get(pk=other_topic.pk).question_count, 2)
+
+
+class CourseListValidatorTests(LearningTestCase):
+    def test_list_without_catalog_aggregate(self):
+        # page count + page, the validator needs no query
+        with self.assertNumQueries(2):
+            self.client.get("/api/courses/")
+
+    def test_etag_follows_the_catalog_tag(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": location,
+            },
+        }):
+            etag = self.client.get("/api/courses/")["ETag"]
+            response = self.client.get("/api/courses/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            self.teacher.first_name = "Ada"
+            self.teacher.save()
+            response = self.client.get("/api/courses/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["results"][0]["author_name"], "Ada")
+
+
+
+class CursorPaginationTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        for n in range(25):
+            make_course(self.teacher, title=f"Course {n}", modules=0)
+        self.client = APIClient()
+
+    def test_cursor_pages_cover_the_catalog_once(self):
+        first = self.client.get("/api/courses/?pagination=cursor").data
+        self.assertNotIn("count", first)
+        self.assertIn("cursor=", first["next"])
+        self.assertIn("pagination=cursor", first["next"])
+        # the next link does not depend on when the page was read
+        self.assertEqual(self.client.get("/api/courses/?pagination=cursor").data["next"], first["next"])
+
+        # a course created meanwhile neither shifts nor repeats the next page
+        make_course(self.teacher, title="Late course", modules=0)
+        second = self.client.get(first["next"]).data
+        ids = [course["id"] for course in first["results"] + second["results"]]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, sorted(Course.objects.values_list("pk", flat=True)))
+        self.assertIsNone(second["next"])
+
+    def test_ranked_search_stays_on_page_numbers(self):
+        response = self.client.get("/api/courses/?pagination=cursor&search=python")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["id"], self.course.pk)
+
+        ordered = self.client.get("/api/courses/?pagination=cursor&search=course&ordering=title").data
+        self.assertNotIn("count", ordered)
+
+
+class CourseSearchTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        self.in_title = make_course(self.teacher, title="Django basics", modules=0)
+        self.in_description = make_course(self.teacher, title="Web", modules=0)
+        self.in_description.description = "Views and models in Django"
+        self.in_description.save()
+        self.in_topic = make_course(self.teacher, title="Databases")
+        topic = self.in_topic.modules.get().topics.get()
+        topic.title = "The Django ORM"
+        topic.save()
+
+    def search(self, text):
+        response = APIClient().get("/api/courses/", {"search": text})
+        return [course["id"] for course in response.data["results"]]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(
+            self.search("django"),
+            [self.in_title.pk, self.in_description.pk, self.in_topic.pk],
+        )
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("django orm"), [self.in_topic.pk])
+        self.assertEqual(self.search("basics"), [self.course.pk, self.in_title.pk])
+
+    def test_saves_outside_the_api_refresh_the_search_document(self):
+        with mock.patch("core.signals.refresh_course_search_document") as refresh:
+            self.course.title = "Renamed"
+            self.course.save()
+            refresh.assert_called_once_with(self.course.pk)
+
+            refresh.reset_mock()
+            self.course.save(update_fields=["slug"])
+            refresh.assert_not_called()
+
+            Module.objects.create(course=self.course, title="Extra", order=5)
+            refresh.assert_called_once_with(self.course.pk)
+
+    @skipUnless(connection.vendor == "postgresql", "ranked search needs PostgreSQL")
+    def test_postgres_ranking(self):
+        # title (weight A) over topic titles (B) over the description (C)
+        self.assertEqual(
+            self.search("django"),
+            [self.in_title.pk, self.in_topic.pk, self.in_description.pk],
+        )
+        # trigram similarity catches typos in the title
+        self.assertIn(self.in_title.pk, self.search("djnago basics"))
+
+
+class AnswerArchiveTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        for question in self.questions:
+            self.answer(question)
+        self.next_url = f"/api/learning/topics/{self.topic.pk}/next-question/"
+        self.assertTrue(self.student_client.get(self.next_url).data["completed"])
+        archive_finished_attempts(timezone.now() + timedelta(seconds=1))
+        self.assertEqual(TopicQuestionAnswer.objects.count(), 0)
+
+    def add_question(self):
+        question = TopicQuestion.objects.create(topic=self.topic, text="New", order=10)
+        TopicQuestionOption.objects.create(question=question, text="yes", is_correct=True)
+        refresh_topic_counters([self.topic.pk])
+        return question
+
+    def test_archived_attempt_reads_as_finished(self):
+        response = self.student_client.get(self.next_url)
+        self.assertTrue(response.data["completed"])
+        self.assertEqual(response.data["answered_questions"], 2)
+
+    def test_new_question_after_archiving(self):
+        answered_at = dict(TopicQuestionAnswerArchive.objects.values_list("question_id", "answered_at"))
+        new_question = self.add_question()
+        progress = TopicProgress.objects.get(user=self.student, topic=self.topic)
+        self.assertEqual((progress.answered_count, progress.correct_count), (2, 2))
+
+        response = self.student_client.get(self.next_url)
+        self.assertEqual(response.data["question"]["id"], new_question.pk)
+
+        response = self.answer(new_question)
+        self.assertEqual(response.data["answered_questions"], 3)
+        self.assertTrue(response.data["test_completed"])
+        # the attempt is live again, in one table
+        self.assertEqual(TopicQuestionAnswer.objects.filter(user=self.student).count(), 3)
+        self.assertFalse(TopicQuestionAnswerArchive.objects.exists())
+        # restored answers keep the time they were given
+        restored = TopicQuestionAnswer.objects.filter(question_id__in=answered_at)
+        self.assertEqual(dict(restored.values_list("question_id", "answered_at")), answered_at)
+
+        response = self.student_client.get(self.next_url)
+        self.assertTrue(response.data["completed"])
+        self.assertEqual(response.data["answered_questions"], 3)
+
+        refresh_topic_counters([self.topic.pk])
+        progress.refresh_from_db()
+        self.assertEqual((progress.answered_count, progress.correct_count), (3, 3))
+
+    def test_counters_count_each_question_once(self):
+        question = self.questions[0]
+        TopicQuestionAnswer.objects.create(user=self.student, question=question, is_correct=False)
+        refresh_topic_counters([self.topic.pk])
+        progress = TopicProgress.objects.get(user=self.student, topic=self.topic)
+        self.assertEqual((progress.answered_count, progress.correct_count), (2, 1))
+
+    def test_archived_answers_load_their_options(self):
+        state = load_practice_state(self.student, self.topic)
+        self.assertEqual(len(state.answers_by_qid), 2)
+        for answer in state.answers_by_qid.values():
+            self.assertNotIn("selected_option_ids", answer.get_deferred_fields())
+
+
+
+class PracticeHistoryTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        for order in range(2, 6):
+            question = TopicQuestion.objects.create(topic=self.topic, text=f"Q{order}", order=order)
+            TopicQuestionOption.objects.create(question=question, text="yes", is_correct=True)
+        refresh_topic_counters([self.topic.pk])
+        for question in self.topic.questions.all():
+            self.answer(question)
+        self.url = f"/api/learning/topics/{self.topic.pk}/history/"
+
+    def test_loader_queries(self):
+        # questions, options, archived answers, live answers
+        with self.assertNumQueries(4):
+            questions, answers = load_practice_history(self.student, self.topic)
+        self.assertEqual(len(questions), 6)
+        self.assertEqual(len(answers), 6)
+
+    def test_history_view_queries(self):
+        # warm the topic -> course and enrollment caches
+        self.assertEqual(self.student_client.get(self.url).status_code, 200)
+        # topic, progress and the four loader queries
+        with self.assertNumQueries(6):
+            response = self.student_client.get(self.url)
+        self.assertEqual(len(response.data["questions"]), 6)
+
+
+
+class ContentVersionTests(LearningTestCase):
+    def topic_payload(self, questions):
+        return {
+            "title": self.topic.title,
+            "questions": [
+                {
+                    "id": question.pk,
+                    "text": question.text,
+                    "options": [
+                        {"id": option.pk, "text": option.text, "is_correct": option.is_correct}
+                        for option in question.options.order_by("id")
+                    ],
+                }
+                for question in questions
+            ],
+        }
+
+    def test_question_deletes_do_not_touch_the_course_per_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            TopicQuestion.objects.filter(topic=self.topic).delete()
+        self.assertEqual(TopicQuestionOption.objects.count(), 0)
+        self.assertFalse([sql for sql in write_statements(queries.captured_queries) if "core_course" in sql])
+
+    def test_admin_delete_bumps_the_version_once(self):
+        self.teacher.is_staff = self.teacher.is_superuser = True
+        self.teacher.save()
+        self.client.force_login(self.teacher)
+        version = Course.objects.get(pk=self.course.pk).content_version
+        response = self.client.post(
+            f"/admin/core/topicquestion/{self.questions[0].pk}/delete/", {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).content_version, version + 1)
+
+    def test_regrades_after_a_changed_answer_key(self):
+        self.assertTrue(self.answer(self.questions[0]).data["is_correct"])
+        question = self.questions[0]
+        payload = self.topic_payload(self.questions)
+        for option in payload["questions"][0]["options"]:
+            option["is_correct"] = option["text"] == "no"
+        self.teacher_client.patch(f"/api/teacher/topics/{self.topic.pk}/", payload, format="json")
+        self.assertTrue(self.answer(question, correct=True).data["is_correct"])
+        self.assertFalse(self.answer(question, correct=False).data["is_correct"])
+
+
+
+class EnrollmentTests(LearningTestCase):
+    def test_enrolling_drops_the_cached_course_ids(self):
+        course = make_course(self.teacher, title="Other course")
+        url = f"/api/learning/topics/{course.modules.get().topics.get().pk}/"
+        self.assertEqual(self.student_client.get(url).status_code, 403)
+
+        response = self.student_client.post(f"/api/courses/{course.pk}/enroll/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_enrolled"])
+        self.assertEqual(self.student_client.get(url).status_code, 200)
+
+
+def question_record(text="Q"):
+    return {
+        "text": text,
+        "order": 0,
+        "options": [{"text": "yes", "is_correct": True}, {"text": "no", "is_correct": False}],
+    }
+
+
+def ndjson(*records) -> bytes:
+    return b"".join(
+        record if isinstance(record, bytes) else json.dumps(record).encode() + b"\n"
+        for record in records
+    )
+
+
+class CourseImportTests(LearningTestCase):
+    url = "/api/teacher/courses/import/"
+
+    def setUp(self):
+        super().setUp()
+        self.course_ids = set(Course.objects.values_list("pk", flat=True))
+
+    def upload(self, content, name, **params):
+        return self.teacher_client.post(
+            self.url + ("?" + "&".join(f"{k}={v}" for k, v in params.items()) if params else ""),
+            {"file": SimpleUploadedFile(name, content)},
+            format="multipart",
+        )
+
+    def imported_course(self):
+        (course,) = Course.objects.exclude(pk__in=self.course_ids)
+        return course
+
+    def assert_nothing_imported(self):
+        self.assertEqual(set(Course.objects.values_list("pk", flat=True)), self.course_ids)
+        self.assertEqual(Module.objects.count(), 1)
+        self.assertEqual(Topic.objects.count(), 1)
+
+    def test_json_document(self):
+        document = {
+            "title": "Imported",
+            "description": "From a file",
+            "modules": [
+                {"title": "M0", "order": 0, "topics": [
+                    {"title": "T0", "order": 0, "questions": [question_record("Q0"), question_record("Q1")]},
+                ]},
+                {"title": "M1", "order": 1, "topics": [{"title": "T1", "order": 0}]},
+            ],
+        }
+        response = self.upload(json.dumps(document).encode(), "course.json")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            response.data["created"],
+            {"modules": 2, "topics": 2, "questions": 2, "options": 4},
+        )
+        course = self.imported_course()
+        self.assertEqual((course.title, course.author), ("Imported", self.teacher))
+        topic = Topic.objects.get(module__course=course, title="T0")
+        self.assertEqual(topic.question_count, 2)
+
+    def test_ndjson_command_in_chunks(self):
+        content = ndjson(
+            {"type": "course", "title": "Lines"},
+            {"type": "module", "id": 7, "title": "M", "order": 0},
+            *({"type": "topic", "module_id": 7, "title": f"T{n}", "order": n, "questions": [question_record()]}
+              for n in range(3)),
+        )
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as upload:
+            upload.write(content)
+            upload.flush()
+            out = io.StringIO()
+            call_command("import_course", upload.name, author="teacher", chunk_size=1, stdout=out)
+
+        self.assertIn("1 modules, 3 topics, 3 questions, 6 options", out.getvalue())
+        course = self.imported_course()
+        self.assertEqual(
+            list(Topic.objects.filter(module__course=course).order_by("order").values_list("title", flat=True)),
+            ["T0", "T1", "T2"],
+        )
+
+    def invalid_rows(self):
+        return ndjson(
+            {"type": "course", "title": "Partly valid"},
+            {"type": "module", "id": 1, "title": "M", "order": 0},
+            {"type": "topic", "module_id": 1, "title": "Kept", "order": 0},
+            {"type": "topic", "module_id": 1, "title": ""},
+            {"type": "topic", "module_id": 99, "title": "Orphan"},
+            b"\xff\xfe\n",
+        )
+
+    def test_invalid_rows_roll_the_import_back(self):
+        response = self.upload(self.invalid_rows(), "course.ndjson")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data["imported"])
+        # decoding errors come first, validation errors when their chunk is flushed
+        self.assertEqual(
+            sorted(error["row"] for error in response.data["errors"]),
+            ["line 4", "line 5", "line 6"],
+        )
+        self.assert_nothing_imported()
+
+    def test_skip_invalid_imports_the_valid_rows(self):
+        response = self.upload(self.invalid_rows(), "course.ndjson", skip_invalid=1)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["error_count"], 3)
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertIn("module_id", errors["line 5"])
+        course = self.imported_course()
+        self.assertEqual(list(Topic.objects.filter(module__course=course).values_list("title", flat=True)), ["Kept"])
+
+    def test_undecodable_upload(self):
+        for name in ("course.ndjson", "course.json"):
+            response = self.upload(b"\xff\xfe", name)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["errors"][0]["errors"], "Not a valid JSON object.")
+        self.assert_nothing_imported()
+
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as upload:
+            upload.write(b"\xff\xfe")
+            upload.flush()
+            with self.assertRaises(CommandError):
+                call_command("import_course", upload.name, author="teacher", stderr=io.StringIO())
+
+
+def course_tree(course):
+    """Everything an export carries, without ids."""
+    return (course.title, course.description, [
+        (module.title, module.order, [
+            (topic.title, topic.content, topic.order, topic.is_timed_test, topic.time_limit_seconds, [
+                (question.text, question.order, question.question_type, question.max_score, [
+                    (option.text, option.is_correct) for option in question.options.order_by("id")
+                ])
+                for question in topic.questions.order_by("order", "id")
+            ])
+            for topic in module.topics.order_by("order", "id")
+        ])
+        for module in course.modules.order_by("order", "id")
+    ])
+
+
+class CourseExportTests(LearningTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = make_course(self.teacher, title="Exported", modules=3, topics=2)
+        self.course.description = "Ünïcode stays as is"
+        self.course.save()
+        modules = list(self.course.modules.order_by("order"))
+        soft_delete_modules([modules[0].pk])
+        soft_delete_topics([modules[1].topics.order_by("order").first().pk])
+
+    def export(self, export_format):
+        response = self.teacher_client.get(
+            f"/api/teacher/courses/{self.course.pk}/export/", {"as": export_format},
+        )
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_exports_round_trip_through_the_importer(self):
+        expected = course_tree(self.course)
+        # the soft-deleted module and topic are left out
+        self.assertEqual([len(topics) for _, _, topics in expected[2]], [1, 2])
+
+        for export_format in ("json", "ndjson"):
+            with self.subTest(export_format):
+                content = self.export(export_format)
+                importer = CourseImporter(self.teacher, chunk_size=1)
+                summary = importer.run(read_records(io.BytesIO(content), export_format))
+
+                self.assertEqual(summary["error_count"], 0, summary["errors"])
+                self.assertEqual(course_tree(importer.course), expected)
+
+    def test_unknown_format(self):
+        response = self.teacher_client.get(f"/api/teacher/courses/{self.course.pk}/export/", {"as": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+
+class CourseSlugTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user("author", password="pw", role=User.Roles.TEACHER)
+
+    def create(self, title):
+        return save_course_with_slug(Course(author=self.author, title=title), title)
+
+    def test_numbered_copies(self):
+        slugs = [self.create("Python").slug for _ in range(3)]
+        self.assertEqual(slugs, ["python", "python-1", "python-2"])
+
+    def test_title_ending_in_a_number_is_not_a_copy(self):
+        self.create("Python 3")
+        self.assertEqual(self.create("Python").slug, "python")
+        self.assertEqual(self.create("Python").slug, "python-1")
+        self.assertEqual(self.create("Python").slug, "python-2")
+        # python-3 belongs to "Python 3", the next copy skips it
+        self.assertEqual(self.create("Python").slug, "python-4")
+        self.assertEqual(next_free_course_slug("Python 3"), "python-3-1")
+
+
+class ConcurrentCourseSlugTests(TransactionTestCase):
+    # at most MAX_ATTEMPTS - 1 other saves can take a slug before the last one
+    workers = 4
+
+    def test_concurrent_creates_get_unique_slugs(self):
+        author = User.objects.create_user("author", password="pw", role=User.Roles.TEACHER)
+        barrier = threading.Barrier(self.workers)
+        errors = []
+
+        def create():
+            try:
+                barrier.wait()
+                save_course_with_slug(Course(author=author, title="Same title"), "Same title")
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        slugs = list(Course.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), self.workers)
+        self.assertEqual(len(set(slugs)), self.workers)
+
+
+@skipUnless(connection.vendor == "postgresql", "the raw upserts only run on PostgreSQL")
+class PostgresUpsertTests(TransactionTestCase):
+    def setUp(self):
+        teacher = User.objects.create_user("teacher", password="pw", role=User.Roles.TEACHER)
+        self.student = User.objects.create_user("student", password="pw")
+        self.topic = make_course(teacher).modules.get().topics.get()
+        self.question = self.topic.questions.order_by("order").first()
+
+    def test_progress_upsert(self):
+        progress, changed = upsert_topic_progress(self.student, self.topic, False, None)
+        self.assertTrue(changed)
+        self.assertEqual(progress.status, TopicProgress.Status.IN_PROGRESS)
+
+        again, changed = upsert_topic_progress(self.student, self.topic, False, None)
+        self.assertFalse(changed)
+        self.assertEqual(again.pk, progress.pk)
+
+        timed, changed = upsert_topic_progress(self.student, self.topic, True, 60)
+        self.assertTrue(changed)
+        self.assertEqual((timed.time_limit_seconds, timed.started_at is not None), (60, True))
+
+    def test_answer_upsert(self):
+        option = self.question.options.get(is_correct=True).pk
+        self.assertEqual(upsert_answer(self.student, self.question, [option], True, 100), (True, False))
+        self.assertEqual(upsert_answer(self.student, self.question, [option], True, 100), (False, True))
+        self.assertEqual(upsert_answer(self.student, self.question, [], False, 0), (False, True))
+        self.assertEqual(upsert_answer(self.student, self.question, [option], True, 100), (False, False))
+        answer = TopicQuestionAnswer.objects.get(user=self.student)
+        self.assertEqual((answer.topic_id, answer.selected_option_ids), (self.topic.pk, [option]))
+
+    def test_unchanged_progress_waits_for_concurrent_answers(self):
+        progress, _ = upsert_topic_progress(self.student, self.topic, False, None)
+        locked, release = threading.Event(), threading.Event()
+
+        def concurrent_answer():
+            try:
+                with transaction.atomic():
+                    TopicProgress.objects.select_for_update().get(pk=progress.pk)
+                    TopicProgress.objects.filter(pk=progress.pk).update(answered_count=1, correct_count=1)
+                    locked.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=concurrent_answer)
+        thread.start()
+        locked.wait(5)
+        threading.Timer(0.5, release.set).start()
+        with transaction.atomic():
+            fresh, changed = upsert_topic_progress(self.student, self.topic, False, None)
+        thread.join()
+
+        self.assertFalse(changed)
+        self.assertEqual((fresh.answered_count, fresh.correct_count), (1, 1))
+
+
+class SelectedOptionsBackfillTests(TransactionTestCase):
+    """
+    Migration 0016 moves answer selections from the M2M table to
+    selected_option_ids, in batches (shrunk here to cross their borders).
+    """
+    before = [("core", "0015_answer_topic_and_archive")]
+    after = [("core", "0016_topicquestionanswer_selected_option_ids")]
+    migration = importlib.import_module("core.migrations.0016_topicquestionanswer_selected_option_ids")
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfill_keeps_every_selected_option(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model("core", "User")
+        Answer = apps.get_model("core", "TopicQuestionAnswer")
+        Option = apps.get_model("core", "TopicQuestionOption")
+        teacher = User.objects.create(username="teacher")
+        student = User.objects.create(username="student")
+        course = apps.get_model("core", "Course").objects.create(author=teacher, title="C", slug="c")
+        module = apps.get_model("core", "Module").objects.create(course=course, title="M", order=0)
+        topic = apps.get_model("core", "Topic").objects.create(module=module, title="T", order=0)
+
+        expected = {}
+        for n in range(5):
+            question = apps.get_model("core", "TopicQuestion").objects.create(topic=topic, text=f"Q{n}", order=n)
+            options = [Option.objects.create(question=question, text=str(k)) for k in range(3)]
+            answer = Answer.objects.create(user=student, question=question, topic=topic)
+            # several options per answer, added out of order; one answer has none
+            chosen = options[n % 3:][::-1]
+            answer.selected_options.set(chosen if n else [])
+            expected[answer.pk] = sorted(option.pk for option in chosen) if n else []
+
+        with mock.patch.object(self.migration, "BATCH_SIZE", 2):
+            apps = self.migrate(self.after)
+            Answer = apps.get_model("core", "TopicQuestionAnswer")
+            self.assertEqual(dict(Answer.objects.values_list("pk", "selected_option_ids")), expected)
+
+            apps = self.migrate(self.before)
+            Answer = apps.get_model("core", "TopicQuestionAnswer")
+            restored = {
+                answer.pk: sorted(answer.selected_options.values_list("pk", flat=True))
+                for answer in Answer.objects.all()
+            }
+        self.assertEqual(restored, expected)
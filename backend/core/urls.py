@@ -21,6 +21,8 @@ from .views import (
     TopicQuestionAnswerView,
     TopicPracticeHistoryView,
     TopicPracticeResetView,
+    JobListView,
+    JobDetailView,
 )
 
 # Router for teacher viewsets
@@ -52,6 +54,10 @@ urlpatterns = [
     # teacher endpoints (using router)
     path("", include(router.urls)),
 
+    # background jobs
+    path("jobs/", JobListView.as_view(), name="job-list"),
+    path("jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+
     # learning
     path("learning/courses/<int:pk>/", LearningCourseDetailView.as_view(), name="learning-course-detail"),
     path("learning/topics/<int:pk>/", TopicTheoryView.as_view(), name="learning-topic-detail"),
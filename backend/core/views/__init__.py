@@ -18,6 +18,7 @@ from .teacher import (
     TeacherModuleViewSet,
     TeacherTopicViewSet,
 )
+from .jobs import JobListView, JobDetailView
 from .learning import (
     LearningCourseDetailView,
     TopicTheoryView,
@@ -42,6 +43,8 @@ __all__ = [
     "TeacherCourseViewSet",
     "TeacherModuleViewSet",
     "TeacherTopicViewSet",
+    "JobListView",
+    "JobDetailView",
     "LearningCourseDetailView",
     "TopicTheoryView",
     "TopicNextQuestionView",
@@ -1,37 +1,105 @@
-from rest_framework import generics, permissions, status
+from django.db.models import Exists, OuterRef, Value
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
 from rest_framework.views import APIView
 
-from ..models import Course
+from ..conditional import (
+    ConditionalGetMixin,
+    author_version,
+    catalog_version,
+    course_version,
+    latest,
+    make_etag,
+    user_version,
+)
+from ..models import Course, User
+from ..pagination import OptionalCursorPagination
+from ..services.search import CourseSearchFilter
 from ..serializers import (
     CourseListSerializer,
     CourseDetailSerializer
 )
 
 
+def annotate_is_enrolled(queryset, user):
+    """
+    Adds `user_is_enrolled` to every course in the same SELECT,
+    read by the serializers' get_is_enrolled instead of one query per course.
+    """
+    if not user or user.is_anonymous:
+        return queryset
+    enrollments = User.enrolled_courses.through.objects.filter(
+        course_id=OuterRef("pk"),
+        user_id=user.pk,
+    )
+    return queryset.annotate(user_is_enrolled=Exists(enrollments))
+
+
 # GET /api/courses/
-class CourseListView(generics.ListAPIView):
+class CourseListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = CourseListSerializer
     permission_classes = (permissions.AllowAny,)
+    pagination_class = OptionalCursorPagination
+    filter_backends = (
+        DjangoFilterBackend,
+        filters.OrderingFilter,
+        CourseSearchFilter,
+    )
 
     filterset_fields = ["author_id"]
-    search_fields = ["title", "description"]
     ordering_fields = ["title", "id"]
     ordering = ["id"]
 
     queryset = Course.objects.select_related("author")
 
+    def get_queryset(self):
+        return annotate_is_enrolled(super().get_queryset(), self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # validated from the catalog tag, before the page is queried
+        catalog = catalog_version()
+        if catalog is not None:
+            etag = make_etag(
+                "course-list",
+                catalog,
+                request.get_full_path(),
+                user_version(request.user),
+            )
+            not_modified = self.not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+        return super().list(request, *args, **kwargs)
+
 # GET /api/courses/<id>/
-class CourseDetailView(generics.RetrieveAPIView):
+class CourseDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     serializer_class = CourseDetailSerializer
     permission_classes = (permissions.AllowAny,)
 
-    queryset = (
-        Course.objects
-        .select_related("author")
-        .prefetch_related("modules__topics")
-    )
+    # modules/topics come from the cached course outline
+    queryset = Course.objects.select_related("author")
+
+    def get_queryset(self):
+        return annotate_is_enrolled(super().get_queryset(), self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        course = self.get_object()
+        etag = make_etag(
+            "course",
+            course_version(course.pk, course.content_version, course.content_updated_at),
+            author_version(course.author),
+            user_version(request.user),
+        )
+        last_modified = latest(
+            course.content_updated_at,
+            getattr(request.user, "progress_updated_at", None),
+        )
+        not_modified = self.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(course)
+        return Response(serializer.data)
 
 # POST /api/courses/<id>/enroll/
 class EnrollCourseView(APIView):
@@ -47,7 +115,9 @@ class EnrollCourseView(APIView):
             )
 
         user = request.user
+        # the m2m_changed receiver drops the cached enrolled course ids
         user.enrolled_courses.add(course)
+        course.user_is_enrolled = True
 
         serializer = CourseDetailSerializer(
             course,
@@ -59,7 +129,13 @@ class EnrollCourseView(APIView):
 class MyCoursesListView(generics.ListAPIView):
     serializer_class = CourseListSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = OptionalCursorPagination
+
+    ordering_fields = ["title", "id"]
+    ordering = ["id"]
 
     def get_queryset(self):
         user = self.request.user
-        return user.enrolled_courses.select_related("author")
+        return user.enrolled_courses.select_related("author").annotate(
+            user_is_enrolled=Value(True),
+        )
@@ -0,0 +1,40 @@
+from django.urls import reverse
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from ..models import Job
+from ..serializers import JobSerializer
+
+
+def job_accepted(request, job: Job) -> Response:
+    """202 for an operation handed to the background worker."""
+    return Response(
+        {
+            "job_id": job.pk,
+            "status": job.status,
+            "status_url": request.build_absolute_uri(reverse("job-detail", args=[job.pk])),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+# GET /api/jobs/
+class JobListView(generics.ListAPIView):
+    serializer_class = JobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        queryset = Job.objects.filter(owner=self.request.user)
+        job_status = self.request.query_params.get("status")
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+
+# GET /api/jobs/<id>/
+class JobDetailView(generics.RetrieveAPIView):
+    serializer_class = JobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return Job.objects.filter(owner=self.request.user)
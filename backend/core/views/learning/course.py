@@ -2,38 +2,55 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from ...conditional import (
+    ConditionalGetMixin,
+    author_version,
+    course_version,
+    latest,
+    make_etag,
+    user_version,
+)
 from ...models import Course, TopicProgress
 from ...serializers import LearningCourseSerializer
+from ...services import is_enrolled
 
 
 # GET /api/learning/courses/<id>/
-class LearningCourseDetailView(APIView):
+class LearningCourseDetailView(ConditionalGetMixin, APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, pk):
         try:
-            course = (
-                Course.objects
-                .select_related("author")
-                .prefetch_related("modules__topics")
-                .get(pk=pk)
-            )
+            course = Course.objects.select_related("author").get(pk=pk)
         except Course.DoesNotExist:
             return Response(
                 {"detail": "Course not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        if not request.user.enrolled_courses.filter(pk=course.pk).exists():
+        if not is_enrolled(request.user, course.pk):
             return Response(
                 {"detail": "You are not enrolled in this course."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        progress_qs = (TopicProgress.objects
-            .filter(user=request.user, topic__module__course=course)
-            .select_related("topic")
+        course.user_is_enrolled = True
+
+        etag = make_etag(
+            "learning-course",
+            course_version(course.pk, course.content_version, course.content_updated_at),
+            author_version(course.author),
+            user_version(request.user),
         )
-        progress_map = {p.topic.id: p for p in progress_qs}
+        last_modified = latest(course.content_updated_at, request.user.progress_updated_at)
+        not_modified = self.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        progress_qs = TopicProgress.objects.filter(
+            user=request.user,
+            topic__module__course=course,
+        ).only("id", "topic_id", "status", "score")
+        progress_map = {p.topic_id: p for p in progress_qs}
         serializer = LearningCourseSerializer(
             course,
             context={"request": request, "progress_map": progress_map},
@@ -2,8 +2,10 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ...models import Topic, TopicProgress, TopicQuestion, TopicQuestionAnswer
+from ...models import Topic, TopicProgress
 from ...serializers.learning import TopicPracticeHistoryQuestionSerializer
+from .state import load_practice_history
+from .utils import check_topic_access
 
 
 # GET /api/learning/topics/<id>/history/
@@ -11,21 +13,18 @@ class TopicPracticeHistoryView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, pk):
+        denied = check_topic_access(request.user, pk)
+        if denied is not None:
+            return denied
+
         try:
-            topic = Topic.objects.select_related("module__course").get(pk=pk)
+            topic = Topic.objects.defer("content").get(pk=pk)
         except Topic.DoesNotExist:
             return Response(
                 {"detail": "Topic not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        course = topic.module.course
-        if not course.students.filter(pk=request.user.pk).exists():
-            return Response(
-                {"detail": "You are not enrolled in this course."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
         progress = (TopicProgress.objects.filter(
             user=request.user,
             topic=topic
@@ -39,21 +38,9 @@ class TopicPracticeHistoryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        questions_qs = (
-            TopicQuestion.objects
-                .filter(topic=topic)
-                .order_by("order", "id")
-        )
-
-        answers_qs = (
-            TopicQuestionAnswer.objects
-                .filter(user=request.user, question__topic=topic)
-                .select_related("question")
-                .prefetch_related("selected_options")
-        )
-        answers_map = {a.question_id: a for a in answers_qs}
+        questions, answers_map = load_practice_history(request.user, topic)
         serializer = TopicPracticeHistoryQuestionSerializer(
-            questions_qs,
+            questions,
             many=True,
             context={"user_answers_map": answers_map},
         )
@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.response import Response
@@ -7,17 +9,24 @@ from ...models import (
     Topic,
     TopicProgress,
     TopicQuestion,
-    TopicQuestionOption,
-    TopicQuestionAnswer,
 )
+from ...services import mark_progress_changed, shift_answer_counters
+from ...services.archive import FINISHED_STATUSES, restore_archived_answers
+from ...services.grading import get_compiled_question
+from ...services.progress import visible_progress
+from ...services.upserts import upsert_answer
 from ...serializers import (
     TopicPracticeQuestionSerializer,
     TopicQuestionAnswerSubmitSerializer,
 )
+from .state import load_practice_state, practice_totals
 from .utils import (
+    check_topic_access,
     get_topic_time_limit_seconds,
+    get_remaining_seconds,
     calculate_score_percent,
     ensure_topic_progress,
+    save_progress_changes,
 )
 
 
@@ -26,51 +35,31 @@ class TopicNextQuestionView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, pk):
+        denied = check_topic_access(request.user, pk)
+        if denied is not None:
+            return denied
+
         try:
-            topic = Topic.objects.select_related("module__course").get(pk=pk)
+            # the practice views never show the theory text
+            topic = Topic.objects.defer("content").get(pk=pk)
         except Topic.DoesNotExist:
             return Response(
                 {"detail": "Topic not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        course = topic.module.course
-        if not course.students.filter(pk=request.user.pk).exists():
-            return Response(
-                {"detail": "You are not enrolled in this course."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
-        time_limit_seconds = get_topic_time_limit_seconds(topic)
-        is_timed = bool(time_limit_seconds)
-        progress = ensure_topic_progress(request.user, topic, is_timed, time_limit_seconds)
-
-        questions = list(
-            TopicQuestion.objects.filter(topic=topic).order_by("order", "id")
-        )
-        total_questions = len(questions)
-
-        answers_qs = (
-            TopicQuestionAnswer.objects
-            .filter(user=request.user, question__topic=topic)
-            .select_related("question")
-            .prefetch_related("selected_options")
-        )
-        answers_by_qid = {a.question_id: a for a in answers_qs}
-
-        correct_count = sum(1 for a in answers_qs if a.is_correct)
+        state = load_practice_state(request.user, topic)
+        progress = state.progress
+        total_questions = state.total_questions
+        correct_count = state.correct_count
 
-        if is_timed:
+        if state.is_timed:
             now = timezone.now()
-            limit_seconds = progress.time_limit_seconds or time_limit_seconds or 0
-            elapsed_seconds = (
-                int((now - progress.started_at).total_seconds())
-                if progress.started_at else 0
-            )
-            remaining_seconds = max(limit_seconds - elapsed_seconds, 0)
+            limit_seconds = state.limit_seconds
+            remaining_seconds = state.remaining_seconds(now)
 
             timed_out = progress.timed_out or remaining_seconds <= 0
-            answered_total = len(answers_by_qid)
+            answered_total = state.answered_count
             completed = (
                     timed_out
                     or answered_total >= total_questions
@@ -79,7 +68,7 @@ class TopicNextQuestionView(APIView):
                         TopicProgress.Status.FAILED,
                     )
             )
-            score_percent = calculate_score_percent(correct_count, total_questions)
+            score_percent = state.score_percent()
             passed = (
                     completed
                     and not timed_out
@@ -87,30 +76,19 @@ class TopicNextQuestionView(APIView):
                     and correct_count == total_questions
             )
 
-            if timed_out and not progress.timed_out:
-                progress.timed_out = True
-
             if completed:
-                status_value = (
-                    TopicProgress.Status.COMPLETED
-                    if passed
-                    else TopicProgress.Status.FAILED
-                )
-                progress.status = status_value
-                progress.score = score_percent
-                if not progress.completed_at:
-                    progress.completed_at = now
-                progress.is_timed = True
-                progress.time_limit_seconds = limit_seconds
-                progress.save(
-                    update_fields=[
-                        "status",
-                        "score",
-                        "completed_at",
-                        "timed_out",
-                        "is_timed",
-                        "time_limit_seconds",
-                    ],
+                save_progress_changes(
+                    progress,
+                    status=(
+                        TopicProgress.Status.COMPLETED
+                        if passed
+                        else TopicProgress.Status.FAILED
+                    ),
+                    score=score_percent,
+                    completed_at=progress.completed_at or now,
+                    timed_out=progress.timed_out or timed_out,
+                    is_timed=True,
+                    time_limit_seconds=limit_seconds,
                 )
                 return Response({
                     "completed": True,
@@ -133,13 +111,7 @@ class TopicNextQuestionView(APIView):
                     "last_answer": None,
                 })
 
-            next_question = None
-            for q in questions:
-                if q.id not in answers_by_qid:
-                    next_question = q
-                    break
-
-            serializer = TopicPracticeQuestionSerializer(next_question)
+            serializer = TopicPracticeQuestionSerializer(state.next_unanswered())
             return Response({
                 "completed": False,
                 "is_timed": True,
@@ -160,39 +132,21 @@ class TopicNextQuestionView(APIView):
                 "last_answer": None,
             })
 
-        next_question = None
-        last_answer = None
-
-        for q in questions:
-            ans = answers_by_qid.get(q.id)
-            if ans is not None and not ans.is_correct:
-                next_question = q
-                last_answer = ans
-                break
-
+        next_question, last_answer = state.first_incorrect()
         if next_question is None:
-            for q in questions:
-                if q.id not in answers_by_qid:
-                    next_question = q
-                    last_answer = None
-                    break
+            next_question = state.next_unanswered()
 
         completed = next_question is None
 
         answered_count = correct_count
-        progress_percent = (
-            round(answered_count * 100 / total_questions) if total_questions else 0
-        )
+        progress_percent = calculate_score_percent(answered_count, total_questions)
 
         if completed:
-            TopicProgress.objects.update_or_create(
-                user=request.user,
-                topic=topic,
-                defaults={
-                    "status": TopicProgress.Status.COMPLETED,
-                    "score": 100,
-                    "completed_at": timezone.now(),
-                },
+            save_progress_changes(
+                progress,
+                status=TopicProgress.Status.COMPLETED,
+                score=100,
+                completed_at=progress.completed_at or timezone.now(),
             )
             return Response({
                 "completed": True,
@@ -218,9 +172,7 @@ class TopicNextQuestionView(APIView):
         if last_answer is not None:
             last_answer_payload = {
                 "is_correct": last_answer.is_correct,
-                "selected_option_ids": list(
-                    last_answer.selected_options.values_list("id", flat=True)
-                ),
+                "selected_option_ids": list(last_answer.selected_option_ids),
                 "score": last_answer.score,
             }
 
@@ -249,40 +201,30 @@ class TopicQuestionAnswerView(APIView):
 
     def post(self, request, pk):
         try:
-            question = TopicQuestion.objects.select_related(
-                "topic__module__course"
-            ).get(pk=pk)
+            question = (
+                TopicQuestion.objects
+                .select_related("topic")
+                .defer("topic__content")
+                .annotate(course_version=F("topic__module__course__content_version"))
+                .get(pk=pk)
+            )
         except TopicQuestion.DoesNotExist:
             return Response(
                 {"detail": "Question not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        denied = check_topic_access(request.user, question.topic_id)
+        if denied is not None:
+            return denied
         topic = question.topic
-        course = topic.module.course
-        if not course.students.filter(pk=request.user.pk).exists():
-            return Response(
-                {"detail": "You are not enrolled in this course."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
-        time_limit_seconds = get_topic_time_limit_seconds(topic)
-        is_timed = bool(time_limit_seconds)
-        progress = ensure_topic_progress(request.user, topic, is_timed, time_limit_seconds)
 
         data_serializer = TopicQuestionAnswerSubmitSerializer(data=request.data)
         data_serializer.is_valid(raise_exception=True)
         option_ids = data_serializer.validated_data["selected_options"]
 
-        options_qs = TopicQuestionOption.objects.filter(
-            question=question, id__in=option_ids,
-        ) if option_ids else TopicQuestionOption.objects.none()
-
-        if option_ids and options_qs.count() != len(option_ids):
-            return Response(
-                {"detail": "Invalid options for this question."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        time_limit_seconds = get_topic_time_limit_seconds(topic)
+        is_timed = bool(time_limit_seconds)
 
         if not is_timed:
             if (
@@ -302,188 +244,126 @@ class TopicQuestionAnswerView(APIView):
                     {"detail": "Select at least one option."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            else:
-                if (
-                        question.question_type == TopicQuestion.QuestionType.SINGLE
-                        and len(option_ids) > 1
-                ):
-                    return Response(
-                        {"detail": "Select no more than one option."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+        elif (
+                question.question_type == TopicQuestion.QuestionType.SINGLE
+                and len(option_ids) > 1
+        ):
+            return Response(
+                {"detail": "Select no more than one option."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            if is_timed:
-                now = timezone.now()
-                limit_seconds = progress.time_limit_seconds or time_limit_seconds or 0
-                elapsed_seconds = (
-                    int((now - progress.started_at).total_seconds())
-                    if progress.started_at else 0
-                )
-                remaining_seconds = max(limit_seconds - elapsed_seconds, 0)
+        # Validation and grading from the compiled question (cached per
+        # course content version): no option query on a warm cache.
+        compiled = get_compiled_question(question, question.course_version)
+        if not compiled.has_options(option_ids):
+            return Response(
+                {"detail": "Invalid options for this question."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                answers_before = TopicQuestionAnswer.objects.filter(
-                    user=request.user,
-                    question__topic=topic,
-                )
-                correct_before = answers_before.filter(is_correct=True).count()
+        with transaction.atomic():
+            progress = ensure_topic_progress(request.user, topic, is_timed, time_limit_seconds)
+            shown_before = visible_progress(progress)
 
+            if is_timed:
+                now = timezone.now()
+                remaining_seconds = get_remaining_seconds(progress, time_limit_seconds, now)
                 if remaining_seconds <= 0:
-                    score_percent = calculate_score_percent(
-                        correct_before,
-                        TopicQuestion.objects.filter(topic=topic).count(),
-                    )
-                    progress.status = TopicProgress.Status.FAILED
-                    progress.timed_out = True
-                    progress.score = score_percent
-                    progress.completed_at = progress.completed_at or now
-                    progress.save(
-                        update_fields=[
-                            "status",
-                            "timed_out",
-                            "score",
-                            "completed_at",
-                        ]
-                    )
-                    return Response(
-                        {
-                            "is_correct": False,
-                            "score": 0,
-                            "answered_questions": answers_before.count(),
-                            "total_questions": TopicQuestion.objects.filter(topic=topic).count(),
-                            "topic_progress_percent": calculate_score_percent(
-                                answers_before.count(),
-                                TopicQuestion.objects.filter(topic=topic).count(),
-                            ),
-                            "test_completed": True,
-                            "timed_out": True,
-                            "passed": False,
-                            "remaining_seconds": 0,
-                            "correct_answers": correct_before,
-                            "score_percent": score_percent,
-                            "time_limit_seconds": limit_seconds,
-                            "is_timed": True,
-                        },
-                        status=status.HTTP_200_OK,
-                    )
+                    return self._timed_out_response(topic, progress, time_limit_seconds, now)
 
-        correct_ids = set(
-            question.options.filter(is_correct=True).values_list("id", flat=True)
-        )
-        selected_set = set(option_ids)
+            if progress.status in FINISHED_STATUSES:
+                # a finished attempt goes on: its archived answers come back first
+                restore_archived_answers(request.user.pk, topic.pk)
 
-        is_correct = bool(correct_ids) and (selected_set == correct_ids)
-        score = question.max_score if is_correct else 0
+            is_correct = compiled.is_correct(option_ids)
+            score = compiled.score(option_ids)
 
-        # Save answer
-        answer, _ = TopicQuestionAnswer.objects.get_or_create(
-            user=request.user,
-            question=question,
-        )
-        answer.is_correct = is_correct
-        answer.score = score
-        answer.answered_at = timezone.now()
-        answer.save()
-        answer.selected_options.set(option_ids)
-
-        all_q_count = TopicQuestion.objects.filter(topic=topic).count()
-        correct_answers_qs = TopicQuestionAnswer.objects.filter(
-            user=request.user,
-            question__topic=topic,
-            is_correct=True,
-        )
+            # Save answer (one upsert); the counter deltas ride along with
+            # the progress UPDATE below
+            created, was_correct = upsert_answer(request.user, question, option_ids, is_correct, score)
+            counter_updates = shift_answer_counters(progress, created, was_correct, is_correct)
 
-        answered_count = correct_answers_qs.count()
+            totals = practice_totals(topic, progress)
+            all_q_count = totals.total_questions
+            correct_total = totals.correct_count
+            answered_total = totals.answered_count
 
-        progress_percent = (
-            round(answered_count * 100 / all_q_count)
-            if all_q_count
-            else 0
-        )
+            answered_count = correct_total
+            progress_percent = calculate_score_percent(answered_count, all_q_count)
 
-        answered_total = TopicQuestionAnswer.objects.filter(
-            user=request.user,
-            question__topic=topic,
-        ).count()
+            if is_timed:
+                now = timezone.now()
+                limit_seconds = progress.time_limit_seconds or time_limit_seconds or 0
+                remaining_seconds = get_remaining_seconds(progress, time_limit_seconds, now)
+                timed_out = progress.timed_out or remaining_seconds <= 0
+                completed = timed_out or answered_total >= all_q_count
+                score_percent = totals.score_percent()
+                passed = (
+                        completed
+                        and not timed_out
+                        and all_q_count > 0
+                        and correct_total == all_q_count
+                )
 
-        if is_timed:
-            now = timezone.now()
-            limit_seconds = progress.time_limit_seconds or time_limit_seconds or 0
-            elapsed_seconds = (
-                int((now - progress.started_at).total_seconds())
-                if progress.started_at else 0
-            )
-            remaining_seconds = max(limit_seconds - elapsed_seconds, 0)
-            timed_out = progress.timed_out or remaining_seconds <= 0
-            completed = timed_out or answered_total >= all_q_count
-            score_percent = calculate_score_percent(
-                correct_answers_qs.count(),
-                all_q_count,
-            )
-            passed = (
-                    completed
-                    and not timed_out
-                    and all_q_count > 0
-                    and correct_answers_qs.count() == all_q_count
-            )
+                if timed_out and not progress.timed_out:
+                    progress.timed_out = True
 
-            if timed_out and not progress.timed_out:
-                progress.timed_out = True
+                progress.status = (
+                    TopicProgress.Status.COMPLETED
+                    if passed
+                    else TopicProgress.Status.FAILED
+                    if completed
+                    else TopicProgress.Status.IN_PROGRESS
+                )
+                progress.score = score_percent
+                if completed and not progress.completed_at:
+                    progress.completed_at = now
+                TopicProgress.objects.filter(pk=progress.pk).update(
+                    status=progress.status,
+                    score=progress.score,
+                    completed_at=progress.completed_at,
+                    timed_out=progress.timed_out,
+                    **counter_updates,
+                )
+                if visible_progress(progress) != shown_before:
+                    mark_progress_changed(request.user.pk)
 
-            progress.status = (
-                TopicProgress.Status.COMPLETED
-                if passed
-                else TopicProgress.Status.FAILED
-                if completed
-                else TopicProgress.Status.IN_PROGRESS
-            )
-            progress.score = score_percent
-            if completed and not progress.completed_at:
-                progress.completed_at = now
-            progress.save(
-                update_fields=[
-                    "status",
-                    "score",
-                    "completed_at",
-                    "timed_out",
-                ]
-            )
+                return Response(
+                    {
+                        "is_correct": is_correct,
+                        "score": score,
+                        "answered_questions": answered_total,
+                        "total_questions": all_q_count,
+                        "topic_progress_percent": totals.answered_percent(),
+                        "test_completed": completed,
+                        "timed_out": timed_out,
+                        "passed": passed,
+                        "remaining_seconds": remaining_seconds,
+                        "correct_answers": correct_total,
+                        "score_percent": score_percent,
+                        "time_limit_seconds": limit_seconds,
+                        "is_timed": True,
+                    }
+                )
 
-            return Response(
-                {
-                    "is_correct": is_correct,
-                    "score": score,
-                    "answered_questions": answered_total,
-                    "total_questions": all_q_count,
-                    "topic_progress_percent": calculate_score_percent(
-                        answered_total,
-                        all_q_count,
-                    ),
-                    "test_completed": completed,
-                    "timed_out": timed_out,
-                    "passed": passed,
-                    "remaining_seconds": remaining_seconds,
-                    "correct_answers": correct_answers_qs.count(),
-                    "score_percent": score_percent,
-                    "time_limit_seconds": limit_seconds,
-                    "is_timed": True,
-                }
+            status_value = TopicProgress.Status.IN_PROGRESS
+            completed_at = None
+            if all_q_count and answered_count >= all_q_count:
+                status_value = TopicProgress.Status.COMPLETED
+                completed_at = timezone.now()
+
+            progress.status = status_value
+            progress.score = progress_percent
+            progress.completed_at = completed_at
+            TopicProgress.objects.filter(pk=progress.pk).update(
+                status=status_value,
+                score=progress_percent,
+                completed_at=completed_at,
+                **counter_updates,
             )
-
-        status_value = TopicProgress.Status.IN_PROGRESS
-        completed_at = None
-        if all_q_count and answered_count >= all_q_count:
-            status_value = TopicProgress.Status.COMPLETED
-            completed_at = timezone.now()
-
-        TopicProgress.objects.update_or_create(
-            user=request.user,
-            topic=topic,
-            defaults={
-                "status": status_value,
-                "score": progress_percent,
-                "completed_at": completed_at,
-            },
-        )
+            if visible_progress(progress) != shown_before:
+                mark_progress_changed(request.user.pk)
 
         return Response(
             {
@@ -502,3 +382,35 @@ class TopicQuestionAnswerView(APIView):
                 "remaining_seconds": None,
             }
         )
+
+    def _timed_out_response(self, topic, progress, time_limit_seconds, now):
+        """
+        Time is over: the submission is not recorded, the attempt is failed.
+        """
+        totals = practice_totals(topic, progress)
+        score_percent = totals.score_percent()
+        save_progress_changes(
+            progress,
+            status=TopicProgress.Status.FAILED,
+            timed_out=True,
+            score=score_percent,
+            completed_at=progress.completed_at or now,
+        )
+        return Response(
+            {
+                "is_correct": False,
+                "score": 0,
+                "answered_questions": totals.answered_count,
+                "total_questions": totals.total_questions,
+                "topic_progress_percent": totals.answered_percent(),
+                "test_completed": True,
+                "timed_out": True,
+                "passed": False,
+                "remaining_seconds": 0,
+                "correct_answers": totals.correct_count,
+                "score_percent": score_percent,
+                "time_limit_seconds": progress.time_limit_seconds or time_limit_seconds or 0,
+                "is_timed": True,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -2,8 +2,10 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ...models import Topic, TopicProgress, TopicQuestionAnswer
-from .utils import get_topic_time_limit_seconds
+from ...models import Topic, TopicProgress, TopicQuestionAnswer, TopicQuestionAnswerArchive
+from ...services import mark_progress_changed
+from ...services.upserts import upsert_row
+from .utils import check_topic_access, get_topic_time_limit_seconds
 
 
 # POST /api/learning/topics/<id>/reset/
@@ -11,38 +13,42 @@ class TopicPracticeResetView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request, pk):
+        denied = check_topic_access(request.user, pk)
+        if denied is not None:
+            return denied
+
         try:
-            topic = Topic.objects.select_related("module__course").get(pk=pk)
+            topic = Topic.objects.defer("content").get(pk=pk)
         except Topic.DoesNotExist:
             return Response(
                 {"detail": "Topic not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        course = topic.module.course
-        if not course.students.filter(pk=request.user.pk).exists():
-            return Response(
-                {"detail": "You are not enrolled in this course."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
         TopicQuestionAnswer.objects.filter(
             user=request.user,
-            question__topic=topic,
+            topic=topic,
         ).delete()
-
-        TopicProgress.objects.update_or_create(
+        TopicQuestionAnswerArchive.objects.filter(
             user=request.user,
             topic=topic,
-            defaults={
+        ).delete()
+
+        upsert_row(
+            TopicProgress,
+            {"user": request.user, "topic": topic},
+            {
                 "status": TopicProgress.Status.NOT_STARTED,
                 "score": None,
                 "completed_at": None,
                 "started_at": None,
                 "timed_out": False,
+                "answered_count": 0,
+                "correct_count": 0,
                 "is_timed": topic.is_timed_test,
                 "time_limit_seconds": get_topic_time_limit_seconds(topic),
             },
         )
+        mark_progress_changed(request.user.pk)
 
         return Response({"detail": "Practice progress has been reset."})
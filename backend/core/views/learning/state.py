@@ -0,0 +1,180 @@
+from django.db.models import Prefetch
+
+from ...models import (
+    Topic,
+    TopicProgress,
+    TopicQuestion,
+    TopicQuestionAnswer,
+    TopicQuestionAnswerArchive,
+    TopicQuestionOption,
+)
+from .utils import (
+    get_topic_time_limit_seconds,
+    get_remaining_seconds,
+    calculate_score_percent,
+    ensure_topic_progress,
+)
+
+
+class PracticeState:
+    """
+    In-memory snapshot of one user's practice on one topic:
+    ordered questions, answers keyed by question id and the progress row.
+    """
+
+    def __init__(self, topic: Topic, progress: TopicProgress, questions, answers):
+        self.topic = topic
+        self.progress = progress
+        self.questions = questions
+        self.answers_by_qid = {a.question_id: a for a in answers}
+
+        self.time_limit_seconds = get_topic_time_limit_seconds(topic)
+        self.is_timed = bool(self.time_limit_seconds)
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    @property
+    def answered_count(self) -> int:
+        return len(self.answers_by_qid)
+
+    @property
+    def correct_count(self) -> int:
+        return sum(1 for a in self.answers_by_qid.values() if a.is_correct)
+
+    @property
+    def limit_seconds(self) -> int:
+        return self.progress.time_limit_seconds or self.time_limit_seconds or 0
+
+    def remaining_seconds(self, now=None) -> int:
+        return get_remaining_seconds(self.progress, self.time_limit_seconds, now)
+
+    def score_percent(self) -> int:
+        return calculate_score_percent(self.correct_count, self.total_questions)
+
+    def next_unanswered(self):
+        for q in self.questions:
+            if q.id not in self.answers_by_qid:
+                return q
+        return None
+
+    def first_incorrect(self):
+        """
+        Returns (question, answer) for the first question answered wrong,
+        or (None, None).
+        """
+        for q in self.questions:
+            ans = self.answers_by_qid.get(q.id)
+            if ans is not None and not ans.is_correct:
+                return q, ans
+        return None, None
+
+
+def load_practice_state(user, topic: Topic, progress: TopicProgress | None = None) -> PracticeState:
+    """
+    Progress row + one query for questions + one query for answers
+    (selected option ids are stored inline with them).
+    """
+    if progress is None:
+        time_limit_seconds = get_topic_time_limit_seconds(topic)
+        progress = ensure_topic_progress(
+            user, topic, bool(time_limit_seconds), time_limit_seconds,
+        )
+
+    questions = list(
+        TopicQuestion.objects
+        .filter(topic=topic)
+        .order_by("order", "id")
+    )
+    answers = list(
+        TopicQuestionAnswer.objects
+        .filter(user=user, topic=topic)
+        .only("id", "question_id", "is_correct", "score", "selected_option_ids")
+    )
+    if not answers and progress.answered_count:
+        # a finished attempt whose answers were moved to the archive;
+        # writes restore them first, so the two tables never mix
+        answers = list(
+            TopicQuestionAnswerArchive.objects
+            .filter(user=user, topic=topic)
+            .only("id", "question_id", "is_correct", "score", "selected_option_ids")
+        )
+    return PracticeState(topic, progress, questions, answers)
+
+
+class PracticeTotals:
+    """
+    Question / answer counters for one user and topic, without the rows.
+    """
+
+    def __init__(self, total_questions: int, answered_count: int, correct_count: int):
+        self.total_questions = total_questions
+        self.answered_count = answered_count
+        self.correct_count = correct_count
+
+    def score_percent(self) -> int:
+        return calculate_score_percent(self.correct_count, self.total_questions)
+
+    def answered_percent(self) -> int:
+        return calculate_score_percent(self.answered_count, self.total_questions)
+
+
+def practice_totals(topic: Topic, progress: TopicProgress) -> PracticeTotals:
+    """
+    Read straight from the denormalized counters, no query.
+    """
+    return PracticeTotals(
+        total_questions=topic.question_count,
+        answered_count=progress.answered_count,
+        correct_count=progress.correct_count,
+    )
+
+
+class HistoryAnswer:
+    """
+    What the history shows of one answer, live or archived.
+    """
+
+    def __init__(self, question_id: int, is_correct: bool, selected_option_ids):
+        self.question_id = question_id
+        self.is_correct = is_correct
+        self.selected_option_ids = selected_option_ids
+
+
+def load_practice_history(user, topic: Topic):
+    """
+    Questions (options prefetched) and the user's answers keyed by
+    question id, in four queries whatever the topic size: questions,
+    options, archived answers, live answers.
+    """
+    questions = list(
+        TopicQuestion.objects
+        .filter(topic=topic)
+        .order_by("order", "id")
+        .prefetch_related(
+            Prefetch(
+                "options",
+                queryset=TopicQuestionOption.objects.only("id", "question_id", "text").order_by("id"),
+            ),
+        )
+    )
+
+    answers_map = {
+        question_id: HistoryAnswer(question_id, is_correct, selected_option_ids)
+        for question_id, is_correct, selected_option_ids in (
+            TopicQuestionAnswerArchive.objects
+            .filter(user=user, topic=topic)
+            .values_list("question_id", "is_correct", "selected_option_ids")
+        )
+    }
+
+    # live answers win over archived ones for the same question
+    for question_id, is_correct, selected_option_ids in (
+        TopicQuestionAnswer.objects
+        .filter(user=user, topic=topic)
+        .values_list("question_id", "is_correct", "selected_option_ids")
+    ):
+        answers_map[question_id] = HistoryAnswer(question_id, is_correct, selected_option_ids)
+
+    return questions, answers_map
@@ -2,15 +2,46 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ...models import Topic, TopicProgress
+from ...conditional import ConditionalGetMixin, course_version, latest, make_etag, user_version
+from ...models import Course, Topic, TopicProgress
 from ...serializers import TopicTheorySerializer
+from ...services import get_topic_course_id
+from .utils import check_topic_access
 
 
 # GET /api/learning/topics/<id>/
-class TopicTheoryView(APIView):
+class TopicTheoryView(ConditionalGetMixin, APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, pk):
+        denied = check_topic_access(request.user, pk)
+        if denied is not None:
+            return denied
+
+        # validators come from the course row only; the (large) topic
+        # content is not read when the client's copy is still current
+        course_id = get_topic_course_id(pk)
+        versions = (
+            Course.objects
+            .filter(pk=course_id)
+            .values("content_version", "content_updated_at")
+            .first()
+        )
+        if versions is not None:
+            etag = make_etag(
+                "topic-theory",
+                pk,
+                course_version(course_id, versions["content_version"], versions["content_updated_at"]),
+                user_version(request.user),
+            )
+            last_modified = latest(
+                versions["content_updated_at"],
+                request.user.progress_updated_at,
+            )
+            not_modified = self.not_modified(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
         try:
             topic = Topic.objects.select_related("module__course").get(pk=pk)
         except Topic.DoesNotExist:
@@ -19,13 +50,6 @@ class TopicTheoryView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        course = topic.module.course
-        if not course.students.filter(pk=request.user.pk).exists():
-            return Response(
-                {"detail": "You are not enrolled in this course."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
         progress = TopicProgress.objects.filter(
             user=request.user,
             topic=topic
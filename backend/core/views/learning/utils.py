@@ -1,5 +1,30 @@
 from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
 from ...models import Topic, TopicProgress
+from ...services import get_topic_course_id, is_enrolled, mark_progress_changed
+from ...services.progress import visible_progress
+from ...services.upserts import upsert_topic_progress
+
+
+def check_topic_access(user, topic_id):
+    """
+    404 / 403 response for a topic the user cannot open, None otherwise.
+    Served from the topic->course and enrollment caches, no query when warm.
+    """
+    course_id = get_topic_course_id(topic_id)
+    if course_id is None:
+        return Response(
+            {"detail": "Topic not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if not is_enrolled(user, course_id):
+        return Response(
+            {"detail": "You are not enrolled in this course."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return None
 
 
 def get_topic_time_limit_seconds(topic: Topic):
@@ -16,37 +41,34 @@ def calculate_score_percent(correct_count: int, total_questions: int) -> int:
     return round(correct_count * 100 / total_questions)
 
 
-def ensure_topic_progress(user, topic: Topic, is_timed: bool, time_limit_seconds: int | None):
-    progress, _ = TopicProgress.objects.get_or_create(
-        user=user,
-        topic=topic,
-        defaults={
-            "status": TopicProgress.Status.IN_PROGRESS,
-            "is_timed": is_timed,
-            "time_limit_seconds": time_limit_seconds if is_timed else None,
-            "started_at": timezone.now() if is_timed else None,
-        },
+def get_remaining_seconds(progress: TopicProgress, time_limit_seconds: int | None, now=None) -> int:
+    now = now or timezone.now()
+    limit_seconds = progress.time_limit_seconds or time_limit_seconds or 0
+    elapsed_seconds = (
+        int((now - progress.started_at).total_seconds())
+        if progress.started_at else 0
     )
+    return max(limit_seconds - elapsed_seconds, 0)
 
-    updates = []
-    if progress.status == TopicProgress.Status.NOT_STARTED:
-        progress.status = TopicProgress.Status.IN_PROGRESS
-        updates.append("status")
 
-    if progress.is_timed != is_timed:
-        progress.is_timed = is_timed
-        updates.append("is_timed")
-
-    if is_timed:
-        effective_limit = time_limit_seconds or 120
-        if progress.time_limit_seconds != effective_limit:
-            progress.time_limit_seconds = effective_limit
-            updates.append("time_limit_seconds")
-        if not progress.started_at:
-            progress.started_at = timezone.now()
-            updates.append("started_at")
+def ensure_topic_progress(user, topic: Topic, is_timed: bool, time_limit_seconds: int | None):
+    progress, changed = upsert_topic_progress(user, topic, is_timed, time_limit_seconds)
+    if changed:
+        mark_progress_changed(user.pk)
+    return progress
 
-    if updates:
-        progress.save(update_fields=updates)
 
-    return progress
+def save_progress_changes(progress: TopicProgress, **values) -> None:
+    """
+    Write only the fields whose value changes (nothing when a finished
+    topic is polled again) and move the user's validators only when
+    something the learning views show has changed.
+    """
+    before = visible_progress(progress)
+    changed = [name for name, value in values.items() if getattr(progress, name) != value]
+    for name in changed:
+        setattr(progress, name, values[name])
+    if changed:
+        progress.save(update_fields=changed)
+    if visible_progress(progress) != before:
+        mark_progress_changed(progress.user_id)
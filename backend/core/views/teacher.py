@@ -1,6 +1,13 @@
 import json
+import os
+import uuid
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
@@ -8,22 +15,147 @@ from ..models import Course, Module, Topic
 from ..models.learning import TopicQuestion, TopicQuestionOption
 from ..serializers.teacher import (
     TeacherCourseSerializer,
+    TeacherCourseListSerializer,
     TeacherModuleSerializer,
+    TeacherModuleListSerializer,
     TeacherTopicSerializer,
+    TeacherTopicListSerializer,
 )
 from ..permissions import IsTeacher
+from ..services import mark_course_changed
+from ..services.export import EXPORT_FORMATS, EXPORT_JSON, EXPORT_NDJSON, iter_course_export
+from ..services.importer import IMPORT_FORMATS, CourseImporter, guess_import_format, read_records
+from ..services.deletion import (
+    delete_module,
+    delete_topic,
+    purge_course,
+    soft_delete_modules,
+    soft_delete_topics,
+)
+from ..services.jobs import enqueue, request_data_payload
+from .jobs import job_accepted
+
+# Column sets for the prefetched tree levels
+MODULE_CARD_FIELDS = ("id", "course_id", "title", "order")
+TOPIC_CARD_FIELDS = (
+    "id", "module_id", "title", "order",
+    "is_timed_test", "time_limit_seconds", "question_count",
+)
+TOPIC_FIELDS = TOPIC_CARD_FIELDS + ("content",)
+QUESTION_FIELDS = ("id", "topic_id", "text", "order", "question_type", "max_score")
+OPTION_FIELDS = ("id", "question_id", "text", "is_correct")
+
+
+def topic_tree_prefetch(prefix=""):
+    """Prefetch objects for topics -> questions -> options below `prefix`."""
+    return (
+        Prefetch(f"{prefix}topics", queryset=Topic.objects.only(*TOPIC_FIELDS)),
+        Prefetch(f"{prefix}topics__questions", queryset=TopicQuestion.objects.only(*QUESTION_FIELDS)),
+        Prefetch(
+            f"{prefix}topics__questions__options",
+            queryset=TopicQuestionOption.objects.only(*OPTION_FIELDS),
+        ),
+    )
+
+
+class TeacherScope:
+    """
+    What the requesting teacher owns, as lazy querysets filtered by direct
+    joins on the author (no nested Course/Module subqueries). Built once per
+    request and shared by get_queryset and the serializer context.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @classmethod
+    def for_request(cls, request):
+        scope = getattr(request, "_teacher_scope", None)
+        if scope is None or scope.user != request.user:
+            scope = cls(request.user)
+            request._teacher_scope = scope
+        return scope
+
+    @cached_property
+    def courses(self):
+        return Course.objects.filter(author=self.user)
+
+    @cached_property
+    def modules(self):
+        return Module.objects.filter(course__author=self.user)
+
+    @cached_property
+    def topics(self):
+        return Topic.objects.filter(module__course__author=self.user)
+
+
+class PrefetchProfileMixin:
+    """
+    `prefetch_profiles` maps a viewset action to the prefetches it needs.
+    Actions without a profile (update, destroy, ...) load bare rows: the
+    serializers reload the saved tree themselves.
+    """
+    prefetch_profiles = {}
+    list_serializer_class = None
+
+    def apply_prefetch_profile(self, queryset):
+        return queryset.prefetch_related(*self.prefetch_profiles.get(self.action, ()))
+
+    def get_serializer_class(self):
+        if self.action == "list" and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    @property
+    def teacher_scope(self) -> TeacherScope:
+        return TeacherScope.for_request(self.request)
+
+
+class BackgroundJobMixin:
+    """
+    `?async=1` on heavy actions queues a Job for `manage.py run_jobs` and
+    answers 202 with its id instead of doing the work inside the request.
+    Validation and permission checks still happen in the request.
+    Async deletes soft-delete the rows first, the job purges them.
+    """
+    delete_job_kind = None
+
+    def wants_background(self) -> bool:
+        return self.request.query_params.get("async") in ("1", "true")
+
+    def soft_delete(self, instance):
+        pass
+
+    def destroy(self, request, *args, **kwargs):
+        if self.delete_job_kind and self.wants_background():
+            instance = self.get_object()
+            self.soft_delete(instance)
+            job = enqueue(self.delete_job_kind, {"id": instance.pk}, owner=request.user)
+            return job_accepted(request, job)
+        return super().destroy(request, *args, **kwargs)
 
 
 # GET/POST /api/teacher/courses/
 # GET/PUT/PATCH/DELETE /api/teacher/courses/<id>/
-class TeacherCourseViewSet(viewsets.ModelViewSet):
+class TeacherCourseViewSet(BackgroundJobMixin, PrefetchProfileMixin, viewsets.ModelViewSet):
     serializer_class = TeacherCourseSerializer
+    list_serializer_class = TeacherCourseListSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
+    delete_job_kind = "course.delete"
+    prefetch_profiles = {
+        "list": (
+            Prefetch("modules", queryset=Module.objects.only(*MODULE_CARD_FIELDS)),
+            Prefetch("modules__topics", queryset=Topic.objects.only(*TOPIC_CARD_FIELDS)),
+        ),
+        "retrieve": (
+            Prefetch("modules", queryset=Module.objects.only(*MODULE_CARD_FIELDS)),
+            *topic_tree_prefetch("modules__"),
+        ),
+    }
     
     def get_queryset(self):
-        return Course.objects.filter(author=self.request.user).select_related('author').prefetch_related(
-            'modules__topics__questions__options'
-        ).order_by('-id')
+        queryset = self.teacher_scope.courses.select_related('author').order_by('-id')
+        return self.apply_prefetch_profile(queryset)
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -41,9 +173,30 @@ class TeacherCourseViewSet(viewsets.ModelViewSet):
             print(f"[UPDATE] Parsed {len(parsed_modules)} modules")
             request.data['modules'] = parsed_modules
             request.data._mutable = False
+
+        # image uploads cannot be handed to the worker
+        if self.wants_background() and not request.FILES:
+            partial = kwargs.get('partial', False)
+            instance = self.get_object()
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            job = enqueue(
+                "course.update",
+                {"course_id": instance.pk, "partial": partial, **request_data_payload(request.data)},
+                owner=request.user,
+            )
+            return job_accepted(request, job)
         
         return super().update(request, *args, **kwargs)
     
+    def perform_destroy(self, instance):
+        purge_course(instance.pk)
+
+    def soft_delete(self, instance):
+        # the course row stays until the purge; its content disappears now
+        soft_delete_modules(Module.objects.filter(course=instance).values_list("pk", flat=True))
+        mark_course_changed(instance.pk)
+
     def create(self, request, *args, **kwargs):
         if 'modules' in request.data and isinstance(request.data['modules'], str):
             request.data._mutable = True
@@ -51,42 +204,129 @@ class TeacherCourseViewSet(viewsets.ModelViewSet):
             request.data._mutable = False
         return super().create(request, *args, **kwargs)
 
+    # GET /api/teacher/courses/<id>/export/?as=json|ndjson
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """
+        Streams the whole course tree; memory use does not grow with the
+        course size. `as=ndjson` writes one module / topic record per line.
+        """
+        export_format = request.query_params.get("as", EXPORT_JSON)
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Unknown export format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        course = self.get_object()
+        content_type = (
+            "application/x-ndjson"
+            if export_format == EXPORT_NDJSON
+            else "application/json"
+        )
+        response = StreamingHttpResponse(
+            iter_course_export(course, export_format),
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{course.slug}.{export_format}"'
+        return response
+
+    # POST /api/teacher/courses/import/  (multipart: file, optional as / skip_invalid)
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_course(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"detail": "Upload the course as `file`."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        import_format = request.query_params.get("as") or guess_import_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {"detail": f"Unknown import format. Use one of: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        skip_invalid = request.query_params.get("skip_invalid") in ("1", "true")
+        if self.wants_background():
+            extension = os.path.splitext(upload.name)[1] or f".{import_format}"
+            path = default_storage.save(f"imports/{uuid.uuid4().hex}{extension}", upload)
+            job = enqueue(
+                "course.import",
+                {"path": path, "format": import_format, "skip_invalid": skip_invalid},
+                owner=request.user,
+            )
+            return job_accepted(request, job)
+
+        importer = CourseImporter(request.user, skip_invalid=skip_invalid)
+        summary = importer.run(read_records(upload, import_format))
+        return Response(
+            summary,
+            status=status.HTTP_201_CREATED if importer.imported else status.HTTP_400_BAD_REQUEST,
+        )
+
 
 # GET/POST /api/teacher/modules/
 # GET/PUT/PATCH/DELETE /api/teacher/modules/<id>/
-class TeacherModuleViewSet(viewsets.ModelViewSet):
+class TeacherModuleViewSet(BackgroundJobMixin, PrefetchProfileMixin, viewsets.ModelViewSet):
     serializer_class = TeacherModuleSerializer
+    list_serializer_class = TeacherModuleListSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
+    delete_job_kind = "module.delete"
+    prefetch_profiles = {
+        "list": (
+            Prefetch("topics", queryset=Topic.objects.only(*TOPIC_CARD_FIELDS)),
+        ),
+        "retrieve": topic_tree_prefetch(),
+    }
     
     def get_queryset(self):
-        teacher_courses = Course.objects.filter(author=self.request.user)
-        return Module.objects.filter(course__in=teacher_courses).select_related('course').prefetch_related(
-            'topics__questions__options'
-        ).order_by('course', 'order')
+        queryset = self.teacher_scope.modules.select_related('course').order_by('course', 'order')
+        return self.apply_prefetch_profile(queryset)
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
 
+    def perform_destroy(self, instance):
+        delete_module(instance)
+
+    def soft_delete(self, instance):
+        soft_delete_modules([instance.pk])
+        mark_course_changed(instance.course_id)
+
 
 # GET/POST /api/teacher/topics/ 
 # GET/PUT/PATCH/DELETE /api/teacher/topics/<id>/ 
-class TeacherTopicViewSet(viewsets.ModelViewSet):
+class TeacherTopicViewSet(BackgroundJobMixin, PrefetchProfileMixin, viewsets.ModelViewSet):
     serializer_class = TeacherTopicSerializer
+    list_serializer_class = TeacherTopicListSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
+    delete_job_kind = "topic.delete"
+    prefetch_profiles = {
+        "retrieve": (
+            Prefetch("questions", queryset=TopicQuestion.objects.only(*QUESTION_FIELDS)),
+            Prefetch("questions__options", queryset=TopicQuestionOption.objects.only(*OPTION_FIELDS)),
+        ),
+    }
     
     def get_queryset(self):
-        teacher_courses = Course.objects.filter(author=self.request.user)
-        teacher_modules = Module.objects.filter(course__in=teacher_courses)
-        return Topic.objects.filter(module__in=teacher_modules).select_related('module__course').prefetch_related(
-            'questions__options'
-        ).order_by('module', 'order')
+        queryset = self.teacher_scope.topics.select_related('module__course').order_by('module', 'order')
+        if self.action == "list":
+            queryset = queryset.defer("content")
+        return self.apply_prefetch_profile(queryset)
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         # Filter modules to only those belonging to the teacher's courses
-        teacher_courses = Course.objects.filter(author=self.request.user)
-        context['teacher_modules'] = Module.objects.filter(course__in=teacher_courses)
+        context['teacher_modules'] = self.teacher_scope.modules
         return context
+
+    def perform_destroy(self, instance):
+        delete_topic(instance)
+
+    def soft_delete(self, instance):
+        soft_delete_topics([instance.pk])
+        mark_course_changed(instance.module.course_id)
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',  # Required for allauth
+    'django.contrib.postgres',  # Full-text / trigram search lookups
     
     # Third party
     'rest_framework',
@@ -138,6 +139,53 @@ DATABASES = {
     }
 }
 
+# Cache
+# CACHE_BACKEND selects the backend: "locmem" (default, per process),
+# "file" (shared by local workers, good for tests) or "redis"
+# (production; any Redis-protocol server at REDIS_URL, needs the `redis` package).
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "elearn")
+CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "300"))
+
+if CACHE_BACKEND == "redis":
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"),
+    }
+elif CACHE_BACKEND == "file":
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_FILE_LOCATION", str(BASE_DIR / ".cache")),
+    }
+else:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "elearn-default",
+    }
+
+CACHES = {
+    "default": {
+        **_default_cache,
+        "KEY_PREFIX": CACHE_KEY_PREFIX,
+        "TIMEOUT": CACHE_DEFAULT_TIMEOUT,
+    }
+}
+
+COURSE_OUTLINE_CACHE_TIMEOUT = 60 * 60 * 24  # keys are versioned, entries just expire
+ENROLLMENT_CACHE_TIMEOUT = 60 * 60
+
+# Topics per batch (and server-side cursor fetch size) of streamed course exports
+COURSE_EXPORT_CHUNK_SIZE = int(os.getenv("COURSE_EXPORT_CHUNK_SIZE", "200"))
+# Records validated and bulk-inserted together by course imports
+COURSE_IMPORT_CHUNK_SIZE = int(os.getenv("COURSE_IMPORT_CHUNK_SIZE", "500"))
+# Rows per DELETE statement (and transaction) when purging course subtrees
+COURSE_DELETE_CHUNK_SIZE = int(os.getenv("COURSE_DELETE_CHUNK_SIZE", "2000"))
+
+# Background jobs (manage.py run_jobs): running jobs older than this are
+# considered abandoned by their worker
+JOB_STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER_SECONDS", str(60 * 30)))
+
 ## User model
 AUTH_USER_MODEL = "core.User"
 
@@ -179,6 +227,9 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Text search configuration used for the course catalog search document
+COURSE_SEARCH_CONFIG = os.getenv("COURSE_SEARCH_CONFIG", "simple")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 